@@ -10,6 +10,8 @@ object information, update objects, and perform other actions.
 
 import cmd
 from datetime import datetime
+from itertools import islice
+import json
 import re
 import os
 import sys
@@ -51,7 +53,7 @@ class HBNBCommand(cmd.Cmd):
     }
 
     # List of dot commands supported by the console
-    dot_cmds = ['all', 'count', 'show', 'destroy', 'update']
+    dot_cmds = ['all', 'count', 'show', 'destroy', 'update', 'search']
 
     # Dictionary mapping attribute names to their corresponding types
     types = {
@@ -237,7 +239,7 @@ class HBNBCommand(cmd.Cmd):
             print("** class doesn't exist **")
             return
 
-        if os.getenv('HBNB_TYPE_STORAGE') == 'db':
+        if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'):
             if 'id' not in obj_kwargs:
                 obj_kwargs['id'] = str(uuid.uuid4())
             if 'created_at' not in obj_kwargs:
@@ -246,15 +248,17 @@ class HBNBCommand(cmd.Cmd):
                 obj_kwargs['updated_at'] = str(datetime.now())
 
             new_instance = HBNBCommand.classes[class_name](**obj_kwargs)
-            new_instance.save()
-            print(new_instance.id)
         else:
             new_instance = HBNBCommand.classes[class_name]()
             for key, value in obj_kwargs.items():
                 if key not in ignored_attrs:
                     setattr(new_instance, key, value)
+        try:
             new_instance.save()
-            print(new_instance.id)
+        except ValueError as error:  # A unique value is already used
+            print("** {} **".format(error))
+            return
+        print(new_instance.id)
 
     def help_create(self):
         """
@@ -293,11 +297,11 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        key = c_name + "." + c_id
-        try:
-            print(storage.all()[key])
-        except KeyError:
+        obj = storage.get(c_name, c_id)
+        if obj is None:
             print("** no instance found **")
+            return
+        print(obj)
 
     def help_show(self):
         """
@@ -334,13 +338,12 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        key = c_name + "." + c_id
-
-        try:
-            storage.delete(storage.all()[key])
-            storage.save()
-        except KeyError:
+        obj = storage.get(c_name, c_id)
+        if obj is None:
             print("** no instance found **")
+            return
+        storage.delete(obj)
+        storage.save()
 
     def help_destroy(self):
         """
@@ -352,47 +355,110 @@ class HBNBCommand(cmd.Cmd):
         print("Example: destroy User 123")
         print()
 
+    # Options of the all command, with their default values
+    all_options = {
+        '--limit': None,
+        '--offset': 0,
+        '--page-size': 1000,
+        '--format': 'list'
+    }
+
     def do_all(self, args):
         """
         Shows all objects, or all objects of a class
+
+        Usage: all [className] [--limit N] [--offset N] [--page-size N]
+                   [--format list|jsonl]
+
+        The objects are printed as they are read from storage, one page
+        of --page-size objects at a time. The list format prints the same
+        list as print() would, jsonl prints the dictionary of each object
+        as JSON, one per line.
         """
-        print_list = []
+        c_name = None
+        options = dict(HBNBCommand.all_options)
 
-        if args:
-            args = args.split(' ')[0]  # Remove possible trailing args
-            if args not in HBNBCommand.classes:
-                print("** class doesn't exist **")
+        words = args.split()
+        while words:
+            word = words.pop(0)
+            if word in options:
+                if not words:
+                    print("** value missing **")
+                    return
+                options[word] = words.pop(0)
+            elif word.startswith('--'):
+                print("** unknown option: {} **".format(word))
                 return
-            for k, v in storage.all().items():
-                if k.split('.')[0] == args:
-                    print_list.append(str(v))
-        else:
-            for k, v in storage.all().items():
-                print_list.append(str(v))
+            elif c_name is None:
+                c_name = word
+        if c_name is not None and c_name not in HBNBCommand.classes:
+            print("** class doesn't exist **")
+            return
+        try:
+            limit = options['--limit']
+            limit = None if limit is None else int(limit)
+            offset = int(options['--offset'])
+            page_size = int(options['--page-size'])
+            if (limit is not None and limit < 0) or offset < 0 or \
+                    page_size < 1:
+                raise ValueError
+        except ValueError:
+            print("** invalid value **")
+            return
+        if options['--format'] not in ('list', 'jsonl'):
+            print("** unknown format: {} **".format(options['--format']))
+            return
 
-        print(print_list)
+        objs = storage.iter(c_name, batch_size=page_size)
+        stop = None if limit is None else offset + limit
+        objs = islice(objs, offset, stop)
+        if options['--format'] == 'jsonl':
+            for i, obj in enumerate(objs, 1):
+                print(json.dumps(obj.to_dict()))
+                if i % page_size == 0:
+                    sys.stdout.flush()
+            return
+        print('[', end='')
+        for i, obj in enumerate(objs):
+            print(', ' if i else '', repr(str(obj)), sep='', end='')
+            if (i + 1) % page_size == 0:
+                sys.stdout.flush()
+        print(']')
 
     def help_all(self):
         """
         Provides help documentation for the all command.
 
-        Usage: all [className]
+        Usage: all [className] [--limit N] [--offset N] [--page-size N]
+                   [--format list|jsonl]
         """
         print("Shows all objects, or all objects of a class")
-        print("Example: all User")
+        print("Options: --limit N, --offset N, --page-size N (objects "
+              "printed at a time), --format list|jsonl")
+        print("Example: all User --limit 10 --format jsonl")
         print()
 
+    def count(self, class_name):
+        """
+        Returns the number of instances of a class.
+
+        Args:
+            class_name (str): The name of the class.
+
+        Returns:
+            int: The number of instances, 0 for unknown classes.
+        """
+        if class_name not in HBNBCommand.classes:
+            return 0
+        return storage.count(class_name)
+
     def do_count(self, args):
         """
         Counts the number of instances of a class.
 
         Usage: count <className>
         """
-        count = 0
-        for k, v in storage.all().items():
-            if args == k.split('.')[0]:
-                count += 1
-        print(count)
+        print(self.count(args.split(' ')[0]))
 
     def help_count(self):
         """
@@ -404,6 +470,55 @@ class HBNBCommand(cmd.Cmd):
         print("Example: count User")
         print()
 
+    def do_search(self, args):
+        """
+        Shows the places and reviews best matching some words
+
+        Usage: search [className] <words> [--limit N]
+
+        The objects are ranked by relevance to the words, best first.
+        className restricts the search to Place or Review objects.
+        """
+        words = args.split()
+        limit = '10'
+        if '--limit' in words:
+            i = words.index('--limit')
+            if i + 1 == len(words):
+                print("** value missing **")
+                return
+            limit = words.pop(i + 1)
+            words.pop(i)
+        c_name = None
+        if words and words[0] in HBNBCommand.classes:
+            c_name = words.pop(0)
+        if not words:
+            print("** search text missing **")
+            return
+        try:
+            limit = int(limit)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            print("** invalid value **")
+            return
+        try:
+            objs = storage.search(' '.join(words), c_name, limit)
+        except ValueError:
+            print("** class not searchable **")
+            return
+        print([str(obj) for obj in objs])
+
+    def help_search(self):
+        """
+        Provides help documentation for the search command.
+
+        Usage: search [className] <words> [--limit N]
+        """
+        print("Shows the places and reviews best matching some words")
+        print("Options: --limit N (10 by default)")
+        print("Example: search Place quiet beach house --limit 5")
+        print()
+
     def do_update(self, args):
         """
         Updates the attributes of a certain object.
@@ -431,11 +546,9 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        # Generate key from class and id
-        key = c_name + "." + c_id
-
-        # Determine if key is present
-        if key not in storage.all():
+        # Look the instance up by class and id
+        obj = storage.get(c_name, c_id)
+        if obj is None:
             print("** no instance found **")
             return
 
@@ -468,8 +581,9 @@ class HBNBCommand(cmd.Cmd):
 
             args = [att_name, att_val]
 
-        # Retrieve dictionary of current objects
-        new_dict = storage.all()[key]
+        # Retrieve the instance to update
+        new_dict = obj
+        previous = dict(obj.__dict__)  # Restored if the save is rejected
 
         # Iterate through attr names and values
         for i, att_name in enumerate(args):
@@ -486,10 +600,16 @@ class HBNBCommand(cmd.Cmd):
                 if att_name in HBNBCommand.types:
                     att_val = HBNBCommand.types[att_name](att_val)
 
-                # Update dictionary with name, value pair
-                new_dict.__dict__.update({att_name: att_val})
+                # Set the attribute so that the change is tracked
+                setattr(new_dict, att_name, att_val)
 
-        new_dict.save()  # Save updates to file
+        try:
+            new_dict.save()  # Save updates to file
+        except ValueError as error:  # A unique value is already used
+            new_dict.__dict__.clear()
+            new_dict.__dict__.update(previous)
+            new_dict.mark_dirty()
+            print("** {} **".format(error))
 
     def help_update(self):
         """
@@ -1,17 +1,20 @@
 #!/usr/bin/python3
 """
-This module instantiates an object of class FileStorage or DBStorage
-based on the HBNB_TYPE_STORAGE environment variable.
+This module instantiates an object of class FileStorage, DBStorage or
+SQLiteStorage based on the HBNB_TYPE_STORAGE environment variable.
 """
 import os
 
 from models.engine.db_storage import DBStorage
 from models.engine.file_storage import FileStorage
+from models.engine.sqlite_storage import SQLiteStorage
 
-# Instantiate a FileStorage or DBStorage object based on HBNB_TYPE_STORAGE
-storage = DBStorage() if os.getenv('HBNB_TYPE_STORAGE') == 'db' else FileStorage()
+# Instantiate a FileStorage, DBStorage or SQLiteStorage object based on
+# HBNB_TYPE_STORAGE
+storage_types = {'db': DBStorage, 'sqlite': SQLiteStorage}
+storage = storage_types.get(os.getenv('HBNB_TYPE_STORAGE'), FileStorage)()
 """
-A unique FileStorage/DBStorage instance for all models.
+A unique FileStorage/DBStorage/SQLiteStorage instance for all models.
 """
 
 # Reload the storage data
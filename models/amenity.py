@@ -17,4 +17,4 @@ class Amenity(BaseModel, Base):
         name (str): The name of the amenity.
     """
     __tablename__ = 'amenities'
-    name = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
+    name = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
@@ -9,6 +9,7 @@ across models.
 
 import os
 import uuid
+import weakref
 #from tests.test_models.test_base_model import TestBaseModel
 from datetime import datetime
 from sqlalchemy import Column, String, DATETIME
@@ -25,8 +26,18 @@ class BaseModel:
         id (str): The unique identifier of the model instance.
         created_at (datetime): The datetime when the model instance was created.
         updated_at (datetime): The datetime when the model instance was last updated.
+
+    Setting an attribute marks the instance as dirty until the storage
+    engine takes it with drain_dirty(), or serializes it and calls
+    mark_clean(). A new instance is marked once, when __init__ is done
+    setting its attributes. Writes that do not go through setattr(), such
+    as obj.__dict__.update() or a list attribute changed in place, are
+    not seen: call mark_dirty() after them, or the storage engine keeps
+    the previous values.
     """
 
+    __dirty = weakref.WeakSet()
+
     id = Column(String(60), nullable=False, primary_key=True, unique=True)
     created_at = Column(DATETIME, nullable=False, default=datetime.utcnow())
     updated_at = Column(DATETIME, nullable=False, default=datetime.utcnow())
@@ -45,25 +56,81 @@ class BaseModel:
         attributes, and if any of the attributes are missing, they are set to
         default values (id: unique id, created_at/updated_at: current datetime).
         """
-
+        # The attributes are set without marking the instance dirty each
+        # time, it is marked once at the end
+        set_attr = super().__setattr__
         if not kwargs:
-            self.id = str(uuid.uuid4())
-            self.created_at = datetime.now()
-            self.updated_at = datetime.now()
+            set_attr('id', str(uuid.uuid4()))
+            set_attr('created_at', datetime.now())
+            set_attr('updated_at', datetime.now())
         else:
             for key, value in kwargs.items():
                 if key != '__class__':
                     if key in ('created_at', 'updated_at'):
-                        setattr(self, key, datetime.fromisoformat(value))
+                        set_attr(key, datetime.fromisoformat(value))
                     else:
-                        setattr(self, key, value)
-
-            if not hasattr(self, 'id'):
-                setattr(self, 'id', str(uuid.uuid4()))
-            if not hasattr(self, 'created_at'):
-                setattr(self, 'created_at', datetime.now())
-            if not hasattr(self, 'updated_at'):
-                setattr(self, 'updated_at', datetime.now())
+                        set_attr(key, value)
+
+            # The mapped columns are class attributes, so check the values
+            if getattr(self, 'id', None) is None:
+                set_attr('id', str(uuid.uuid4()))
+            if getattr(self, 'created_at', None) is None:
+                set_attr('created_at', datetime.now())
+            if getattr(self, 'updated_at', None) is None:
+                set_attr('updated_at', datetime.now())
+        BaseModel.__dirty.add(self)
+
+    def __setattr__(self, name, value):
+        """
+        Sets an attribute and marks the instance as dirty.
+
+        Args:
+            name (str): The name of the attribute.
+            value: The value of the attribute.
+        """
+        super().__setattr__(name, value)
+        BaseModel.__dirty.add(self)
+
+    def is_dirty(self):
+        """
+        Tells if an attribute was set since the last call to mark_clean().
+
+        Returns:
+            bool: True if the instance changed.
+        """
+        return self in BaseModel.__dirty
+
+    def mark_dirty(self):
+        """Marks the instance as changed outside of setattr()."""
+        BaseModel.__dirty.add(self)
+
+    def mark_clean(self):
+        """Marks the instance as serialized by the storage engine."""
+        BaseModel.__dirty.discard(self)
+
+    @staticmethod
+    def dirty_instances():
+        """
+        Returns the model instances changed since they were last marked clean.
+
+        Returns:
+            list: The dirty instances that are still alive.
+        """
+        return list(BaseModel.__dirty)
+
+    @staticmethod
+    def drain_dirty():
+        """
+        Returns the dirty model instances and marks them all clean.
+
+        The set is swapped for a new one, which is cheaper than marking
+        each instance clean. The caller keeps track of the changes.
+
+        Returns:
+            list: The dirty instances that are still alive.
+        """
+        dirty, BaseModel.__dirty = BaseModel.__dirty, weakref.WeakSet()
+        return list(dirty)
 
     def __str__(self):
         """
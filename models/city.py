@@ -7,6 +7,7 @@ from tests.test_models.test_base_model import TestBaseModel
 from sqlalchemy import Column, String, ForeignKey
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
+from models.place import Place
 
 
 class City(BaseModel, Base):
@@ -20,6 +21,14 @@ class City(BaseModel, Base):
         places (relationship): The places associated with the city.
     """
     __tablename__ = 'cities'
-    name = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    state_id = Column(String(60), ForeignKey('states.id'), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    places = relationship('Place', cascade='all, delete, delete-orphan', backref='cities') if os.getenv('HBNB_TYPE_STORAGE') == 'db' else None
+    name = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    state_id = Column(String(60), ForeignKey('states.id'), nullable=False, index=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+
+    if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'):
+        places = relationship('Place', cascade='all, delete, delete-orphan', backref='cities')
+    else:
+        @property
+        def places(self):
+            """Returns the places in this City"""
+            from models import storage
+            return storage.related(Place, 'city_id', self.id)
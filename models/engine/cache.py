@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+"""
+This module defines the bounded object cache used by DBStorage.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    This class is a thread-safe least recently used cache with expiry.
+
+    It holds at most max_size entries, adding one more evicts the least
+    recently read or written entry. An entry older than ttl seconds is
+    dropped when it is next read.
+
+    Attributes:
+        max_size (int): The maximum number of entries.
+        ttl (float): The number of seconds an entry stays valid, None for
+            no expiry.
+        hits (int): The number of reads that found a valid entry.
+        misses (int): The number of reads that did not.
+        evictions (int): The number of entries dropped to make room.
+        expirations (int): The number of entries dropped as expired.
+    """
+
+    def __init__(self, max_size=1024, ttl=None, clock=time.monotonic):
+        """
+        Initializes a LRUCache instance.
+
+        Args:
+            max_size (int, optional): The maximum number of entries.
+                Defaults to 1024.
+            ttl (float, optional): The number of seconds an entry stays
+                valid. Defaults to None, no expiry.
+            clock (callable, optional): Returns the current time in
+                seconds. Defaults to time.monotonic.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """Returns the number of entries."""
+        return len(self.__entries)
+
+    def get(self, key, default=None):
+        """
+        Reads an entry and marks it as the most recently used.
+
+        Args:
+            key: The key of the entry.
+            default (optional): Returned when there is no valid entry.
+                Defaults to None.
+
+        Returns:
+            The value of the entry, or default.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and self.ttl is not None and \
+                    self.clock() - entry[1] > self.ttl:
+                del self.__entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Writes an entry, evicting the least recently used one if full.
+
+        Args:
+            key: The key of the entry.
+            value: The value of the entry.
+        """
+        with self.__lock:
+            self.__entries[key] = (value, self.clock())
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        """
+        Drops entries.
+
+        Args:
+            *keys: The keys of the entries to drop.
+        """
+        with self.__lock:
+            for key in keys:
+                self.__entries.pop(key, None)
+
+    def clear(self):
+        """Drops all the entries."""
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The hits, misses, evictions, expirations and size.
+        """
+        with self.__lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self.__entries)
+            }
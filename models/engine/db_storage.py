@@ -3,10 +3,20 @@
 This module defines a class to manage database storage for the hbnb clone.
 """
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
+import threading
+from collections.abc import ItemsView, Mapping, ValuesView
+from datetime import datetime
+from sqlalchemy import create_engine, event, func, inspect, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import InstrumentedAttribute, sessionmaker, scoped_session
+from sqlalchemy.orm import (joinedload, lazyload, raiseload, selectinload,
+                            subqueryload)
 import urllib.parse
 from models.base_model import BaseModel, Base
+from models.engine.cache import LRUCache
+from models.engine.geo import bounding_box, distance_km, lon_ranges
+from models.engine.query import OPERATORS, Query
+from models.engine.search import TEXT_FIELDS, TextIndex, document_text
 from models.state import State
 from models.city import City
 from models.user import User
@@ -15,56 +25,705 @@ from models.amenity import Amenity
 from models.review import Review
 
 
+class StreamView(Mapping):
+    """
+    A read-only mapping of the objects of a DBStorage, read on demand.
+
+    Iterating over the view, its values or its items runs one query per
+    class on a server-side cursor and fetches batch_size rows at a time,
+    so only one batch is held in memory. Iterating over the keys only
+    reads the ids. len() counts the rows and [] looks a key up with
+    DBStorage.get().
+    """
+
+    def __init__(self, storage, session, options, batch_size=1000):
+        """
+        Initializes a StreamView instance.
+
+        Args:
+            storage (DBStorage): The storage the objects are read from.
+            session (Session): The session of the storage.
+            options (dict): The loader options of each class to read.
+            batch_size (int, optional): The number of rows fetched at a
+                time. Defaults to 1000.
+        """
+        self.storage = storage
+        self.session = session
+        self.options = options
+        self.batch_size = batch_size
+
+    def __getitem__(self, key):
+        """Returns the object stored under a <class name>.<id> key."""
+        cls_name, _, obj_id = key.partition('.')
+        for class_type in self.options:
+            if class_type.__name__ == cls_name:
+                obj = self.storage.get(class_type, obj_id)
+                if obj is not None:
+                    return obj
+        raise KeyError(key)
+
+    def __iter__(self):
+        """Iterates over the keys, reading only the ids."""
+        for class_type in self.options:
+            prefix = class_type.__name__ + '.'
+            query = select(class_type.id).execution_options(
+                yield_per=self.batch_size)
+            for obj_id in self.session.scalars(query):
+                yield prefix + obj_id
+
+    def __len__(self):
+        """Returns the number of objects."""
+        return sum(self.storage.count(class_type)
+                   for class_type in self.options)
+
+    def objects(self):
+        """
+        Reads the objects, batch_size rows at a time.
+
+        Yields:
+            BaseModel: The objects.
+        """
+        for class_type, options in self.options.items():
+            query = select(class_type).options(*options).execution_options(
+                yield_per=self.batch_size)
+            yield from self.session.scalars(query)
+
+    def values(self):
+        """Returns a view of the objects, read as it is iterated over."""
+        return _StreamValues(self)
+
+    def items(self):
+        """Returns a view of the (key, object) pairs, read when iterated."""
+        return _StreamItems(self)
+
+
+class _StreamValues(ValuesView):
+    """The values() view of a StreamView."""
+
+    def __iter__(self):
+        """Iterates over the objects with a single query per class."""
+        return self._mapping.objects()
+
+
+class _StreamItems(ItemsView):
+    """The items() view of a StreamView."""
+
+    def __iter__(self):
+        """Iterates over the (key, object) pairs, one query per class."""
+        for obj in self._mapping.objects():
+            yield '{}.{}'.format(obj.__class__.__name__, obj.id), obj
+
+
 class DBStorage:
     """
     This class manages the storage of hbnb models in a SQL database.
+
+    The relationships are loaded lazily, with one SELECT per object and
+    relationship. all() and iter() take a load option listing the
+    relationships to load eagerly with the objects, as
+    '[<class name>.]<relationship>[.<relationship>...][:<strategy>]'
+    paths, e.g. ['Place.reviews.user:selectin', 'amenities:joined'].
+    The strategy is one of load_strategies and defaults to 'selectin'.
+    Paths without a class name apply to every queried class having
+    that relationship. When load is not given, the comma-separated
+    paths of the HBNB_DB_EAGER environment variable are used.
+
+    The storage holds a scoped_session registry, every thread gets its
+    own session from it and returns it with close(). The connection
+    pool is configured with the HBNB_DB_POOL_SIZE, HBNB_DB_MAX_OVERFLOW,
+    HBNB_DB_POOL_RECYCLE and HBNB_DB_POOL_TIMEOUT environment variables.
+
+    When HBNB_DB_CACHE_SIZE is set, get() and all(cls) read through an
+    LRUCache of that many entries, each valid for HBNB_DB_CACHE_TTL
+    seconds (60 by default). The cached objects are merged into the
+    session of the caller without querying the database. Every class
+    has a generation counter, incremented when one of its objects is
+    passed to new() or delete(), or changed and committed by save(),
+    and by reload(). The all(cls) entries are keyed by the generation
+    of cls, so a change makes the next call query the database. The
+    cache attribute can be replaced by any object with the get, put,
+    invalidate and clear methods of LRUCache.
+
+    search() ranks the places and reviews matching a text with a BM25
+    TextIndex read from the database on first use, then updated from
+    the objects flushed by the sessions of this storage. reload() drops
+    it, so the next search reads the changes made by other processes.
     """
 
     __engine = None
     __session = None
 
+    # The mapped model classes
+    all_classes = (User, State, City, Amenity, Place, Review)
+
+    # Engine pool arguments by environment variable, with their types
+    pool_variables = {
+        'HBNB_DB_POOL_SIZE': ('pool_size', int),
+        'HBNB_DB_MAX_OVERFLOW': ('max_overflow', int),
+        'HBNB_DB_POOL_RECYCLE': ('pool_recycle', int),
+        'HBNB_DB_POOL_TIMEOUT': ('pool_timeout', float)
+    }
+
+    # Loader options by relationship loading strategy
+    load_strategies = {
+        'selectin': selectinload,
+        'joined': joinedload,
+        'subquery': subqueryload,
+        'lazy': lazyload,
+        'raise': raiseload
+    }
+
     def __init__(self):
         """Initializes the SQL database storage."""
+        env = os.getenv('HBNB_ENV')
+        self.__engine = self.make_engine()
+        if env == 'test':
+            Base.metadata.drop_all(self.__engine)
+        self.eager = [path.strip() for path in
+                      os.getenv('HBNB_DB_EAGER', '').split(',')
+                      if path.strip()]
+        self.cache = None
+        self.__generations = {}
+        self.__text = None
+        self.__text_lock = threading.RLock()
+        cache_size = int(os.getenv('HBNB_DB_CACHE_SIZE', 0))
+        if cache_size > 0:
+            self.cache = LRUCache(
+                cache_size, float(os.getenv('HBNB_DB_CACHE_TTL', 60)))
+
+    def database_url(self):
+        """
+        Builds the URL of the database from the HBNB_MYSQL_* variables.
+
+        Returns:
+            str: The SQLAlchemy database URL.
+        """
         user = os.getenv('HBNB_MYSQL_USER')
         pword = os.getenv('HBNB_MYSQL_PWD')
         host = os.getenv('HBNB_MYSQL_HOST')
         db_name = os.getenv('HBNB_MYSQL_DB')
-        env = os.getenv('HBNB_ENV')
-        DATABASE_URL = "mysql+mysqldb://{}:{}@{}:3306/{}".format(
+        return "mysql+mysqldb://{}:{}@{}:3306/{}".format(
             user, pword, host, db_name
         )
-        self.__engine = create_engine(
-            DATABASE_URL,
-            pool_pre_ping=True
+
+    def make_engine(self):
+        """
+        Creates the SQLAlchemy engine of the storage.
+
+        Returns:
+            Engine: The engine connected to database_url().
+        """
+        return create_engine(
+            self.database_url(),
+            pool_pre_ping=True,
+            **self.pool_options()
         )
-        if env == 'test':
-            Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
+    def pool_options(self):
+        """
+        Reads the connection pool settings from the environment.
+
+        Returns:
+            dict: The create_engine() pool arguments of the HBNB_DB_POOL_*
+                variables that are set, SQLAlchemy defaults the others.
+        """
+        options = {}
+        for variable, (name, cast) in self.pool_variables.items():
+            value = os.getenv(variable)
+            if value:
+                options[name] = cast(value)
+        return options
+
+    def all(self, cls=None, load=None, stream=False):
         """
         Returns a dictionary of models currently in storage.
 
         Args:
-            cls (class, optional): The class to filter the objects. Defaults to None.
+            cls (class, optional): The class to filter the objects.
+                Defaults to None.
+            load (list, optional): The relationship paths to load eagerly.
+                Defaults to None, the HBNB_DB_EAGER paths.
+            stream (bool, optional): Return a StreamView that reads the
+                objects as it is iterated over, instead of a dictionary
+                holding all of them. Defaults to False.
 
         Returns:
             dict: A dictionary of objects in storage.
         """
         objects = dict()
-        all_classes = (User, State, City, Amenity, Place, Review)
-        if cls is None:
-            for class_type in all_classes:
-                query = self.__session.query(class_type)
-                for obj in query.all():
-                    obj_key = '{}.{}'.format(obj.__class__.__name__, obj.id)
-                    objects[obj_key] = obj
-        else:
-            query = self.__session.query(cls)
-            for obj in query.all():
+        classes = self.all_classes if cls is None else self.__classes_of(cls)
+        if stream:
+            return StreamView(self, self.__session, {
+                class_type: self.__load_options(
+                    class_type, load, cls is not None)
+                for class_type in classes
+            })
+        for class_type in classes:
+            cache_key = ('all', class_type.__name__,
+                         self.generation(class_type))
+            cached = None
+            if load is None:
+                cached = self.__cached(cache_key)
+            if cached is not None:
+                objs = [self.__attach(obj) for obj in cached]
+            else:
+                query = self.__session.query(class_type).options(
+                    *self.__load_options(class_type, load, cls is not None))
+                objs = query.all()
+                if load is None and self.cache is not None:
+                    self.cache.put(cache_key, objs)
+            for obj in objs:
                 obj_key = '{}.{}'.format(obj.__class__.__name__, obj.id)
                 objects[obj_key] = obj
         return objects
 
+    def __cached(self, key):
+        """
+        Reads an entry of the object cache.
+
+        Entries holding objects changed and not yet flushed are dropped,
+        so they are read from the database again.
+
+        Args:
+            key (tuple): The cache key.
+
+        Returns:
+            The cached object or list of objects, or None.
+        """
+        if self.cache is None:
+            return None
+        value = self.cache.get(key)
+        if value is None:
+            return None
+        objs = value if isinstance(value, list) else [value]
+        if any(inspect(obj).modified for obj in objs):
+            self.cache.invalidate(key)
+            return None
+        return value
+
+    def __attach(self, obj):
+        """
+        Returns a cached object as an object of the current session.
+
+        Args:
+            obj (BaseModel): The cached object.
+
+        Returns:
+            BaseModel: The object itself if it belongs to the current
+                session, else a copy merged into it without a query.
+        """
+        if obj in self.__session:
+            return obj
+        return self.__session.merge(obj, load=False)
+
+    def __invalidate(self, *objs):
+        """
+        Drops the cache entries of objects, moves their classes to the
+        next generation.
+
+        Args:
+            *objs: The objects that changed.
+        """
+        for obj in objs:
+            cls_name = obj.__class__.__name__
+            for base in obj.__class__.__mro__:
+                self.__generations[base.__name__] = \
+                    self.generation(base.__name__) + 1
+            if self.cache is not None:
+                self.cache.invalidate(('get', cls_name, obj.id))
+
+    def generation(self, cls):
+        """
+        Returns the generation counter of a class.
+
+        It changes whenever an object of cls or of a subclass is added,
+        changed or deleted through this storage, so results computed from
+        the objects of cls can be kept while it is unchanged. Writes made
+        by other processes are not counted.
+
+        Args:
+            cls (class or str): The class, or its name.
+
+        Returns:
+            int: The generation of cls.
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return self.__generations.get(cls, 0)
+
+    def __load_options(self, cls, load=None, strict=False):
+        """
+        Builds the loader options of a query from relationship paths.
+
+        Args:
+            cls (class): The queried class.
+            load (list, optional): The relationship paths, see DBStorage.
+                Defaults to None, the HBNB_DB_EAGER paths.
+            strict (bool, optional): Raise for paths without a class name
+                that cls has no relationship for. Defaults to False, such
+                paths are skipped.
+
+        Returns:
+            list: The loader options.
+
+        Raises:
+            ValueError: If a strategy or a relationship does not exist.
+        """
+        if load is None:
+            load, strict = self.eager, False
+        class_names = [class_type.__name__ for class_type in self.all_classes]
+        options = []
+        for path in load:
+            path, _, strategy = path.partition(':')
+            strategy = strategy or 'selectin'
+            if strategy not in self.load_strategies:
+                raise ValueError('Unknown loading strategy: ' + strategy)
+            names = path.split('.')
+            if names[0] in class_names:
+                if names[0] != cls.__name__:
+                    continue
+                names = names[1:]
+            elif not strict and names[0] not in inspect(cls).relationships:
+                continue
+            option = None
+            current = cls
+            for name in names:
+                relationship = inspect(current).relationships.get(name)
+                if relationship is None:
+                    raise ValueError('{} has no relationship {}'.format(
+                        current.__name__, name))
+                attr = getattr(current, name)
+                if option is None:
+                    option = self.load_strategies[strategy](attr)
+                else:
+                    option = getattr(option, strategy + 'load')(attr)
+                current = relationship.mapper.class_
+            if option is not None:
+                options.append(option)
+        return options
+
+    def __classes_of(self, cls):
+        """
+        Returns the mapped classes matching a class or a class name.
+
+        Args:
+            cls (class or str): The class, or its name.
+
+        Returns:
+            list: The mapped classes that are cls or subclasses of it.
+        """
+        if isinstance(cls, str):
+            return [class_type for class_type in self.all_classes
+                    if class_type.__name__ == cls]
+        return [class_type for class_type in self.all_classes
+                if issubclass(class_type, cls)]
+
+    def get(self, cls, id):
+        """
+        Returns a single object by class and id.
+
+        The object is looked up by primary key, from the session identity
+        map when it is already loaded.
+
+        Args:
+            cls (class or str): The class of the object, or its name.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if it is not in the database.
+        """
+        if isinstance(cls, str):
+            classes = self.__classes_of(cls)
+            cls = classes[0] if classes else None
+        if cls not in self.all_classes or id is None:
+            return None
+        cache_key = ('get', cls.__name__, id)
+        obj = self.__cached(cache_key)
+        if obj is not None:
+            return self.__attach(obj)
+        obj = self.__session.get(cls, id)
+        if obj is not None and self.cache is not None:
+            self.cache.put(cache_key, obj)
+        return obj
+
+    def places_in_bbox(self, min_lat, min_lon, max_lat, max_lon,
+                       limit=None):
+        """
+        Returns the places inside a latitude/longitude box.
+
+        The box is a range condition on the indexed (latitude, longitude)
+        columns of the places table.
+
+        Args:
+            min_lat (float): The southern latitude of the box.
+            min_lon (float): The western longitude of the box, greater
+                than max_lon for a box crossing the 180th meridian.
+            max_lat (float): The northern latitude of the box.
+            max_lon (float): The eastern longitude of the box.
+            limit (int, optional): The maximum number of places.
+                Defaults to None, no limit.
+
+        Returns:
+            list: The places, ordered by id.
+        """
+        statement = select(Place).where(
+            Place.latitude.between(min_lat, max_lat),
+            or_(*(Place.longitude.between(low, high)
+                  for low, high in lon_ranges(min_lon, max_lon)))
+        ).order_by(Place.id)
+        if limit is not None:
+            statement = statement.limit(limit)
+        return self.__session.scalars(statement).all()
+
+    def places_near(self, lat, lon, radius_km, limit=None):
+        """
+        Returns the places within a distance of a point, nearest first.
+
+        The database returns the places in the bounding box of the circle,
+        the exact distance is checked for those.
+
+        Args:
+            lat (float): The latitude of the point, in degrees.
+            lon (float): The longitude of the point, in degrees.
+            radius_km (float): The search radius in kilometers.
+            limit (int, optional): The maximum number of places.
+                Defaults to None, no limit.
+
+        Returns:
+            list: The places, ordered by distance.
+        """
+        found = []
+        for place in self.places_in_bbox(*bounding_box(lat, lon, radius_km)):
+            distance = distance_km(lat, lon, place.latitude, place.longitude)
+            if distance <= radius_km:
+                found.append((distance, place.id, place))
+        found.sort(key=lambda item: item[:2])
+        return [place for _, _, place in found[:limit]]
+
+    def __index_flushed(self, session, flush_context):
+        """
+        Updates the text index with the objects a session flushed.
+
+        Args:
+            session (Session): The session that was flushed.
+            flush_context: The SQLAlchemy flush context.
+        """
+        with self.__text_lock:
+            if self.__text is None:
+                return
+            for obj in list(session.new) + list(session.dirty):
+                cls_name = obj.__class__.__name__
+                if cls_name in TEXT_FIELDS:
+                    self.__text.add(cls_name + '.' + obj.id, document_text(
+                        obj, TEXT_FIELDS[cls_name]))
+            for obj in session.deleted:
+                self.__text.remove(obj.__class__.__name__ + '.' + obj.id)
+
+    def __text_index(self):
+        """
+        Returns the text index, reading the texts from the database on
+        first use.
+
+        Returns:
+            TextIndex: The index.
+        """
+        if self.__text is not None:
+            return self.__text
+        index = TextIndex()
+        for cls_name, fields in TEXT_FIELDS.items():
+            cls = self.__classes_of(cls_name)[0]
+            statement = select(
+                cls.id, *(getattr(cls, field) for field in fields)
+            ).execution_options(yield_per=1000)
+            for row in self.__session.execute(statement):
+                index.add(cls_name + '.' + row[0],
+                          document_text(dict(zip(fields, row[1:])), fields))
+        self.__text = index
+        return index
+
+    def search(self, text, cls=None, limit=10):
+        """
+        Returns the places and reviews best matching a text.
+
+        Args:
+            text (str): The words to search for.
+            cls (class or str, optional): Place or Review to only search
+                one of them. Defaults to None, both.
+            limit (int, optional): The maximum number of objects.
+                Defaults to 10, None for no limit.
+
+        Returns:
+            list: The objects, best match first.
+
+        Raises:
+            ValueError: If the text of the class is not indexed.
+        """
+        prefix = ''
+        if cls is not None:
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            if cls_name not in TEXT_FIELDS:
+                raise ValueError('No text index for ' + cls_name)
+            prefix = cls_name + '.'
+        with self.__text_lock:
+            ranked = self.__text_index().search(text, limit, prefix)
+        objs = (self.get(*key.split('.', 1)) for key, _ in ranked)
+        return [obj for obj in objs if obj is not None]
+
+    def get_by(self, cls, **conditions):
+        """
+        Returns the first object of a class matching some conditions.
+
+        Args:
+            cls (class or str): The class of the object, or its name.
+            **conditions: The conditions, as for Query.filter(), e.g.
+                email='a@b.c'.
+
+        Returns:
+            BaseModel: The object, or None if none matches.
+        """
+        return self.query(cls).filter(**conditions).first()
+
+    def query(self, cls):
+        """
+        Starts a query on the objects of a class (see Query).
+
+        Args:
+            cls (class or str): The mapped class of the objects, or its name.
+
+        Returns:
+            Query: The query.
+
+        Raises:
+            ValueError: If cls is not one mapped class.
+        """
+        classes = self.__classes_of(cls)
+        if len(classes) != 1:
+            raise ValueError('Cannot query {}'.format(cls))
+        return Query(self, classes[0])
+
+    def __column(self, cls, attr):
+        """
+        Returns the mapped column of a class an attribute name refers to.
+
+        Args:
+            cls (class): The mapped class.
+            attr (str): The attribute name.
+
+        Returns:
+            InstrumentedAttribute: The column attribute.
+
+        Raises:
+            ValueError: If cls has no such column.
+        """
+        column = getattr(cls, attr, None)
+        if not isinstance(column, InstrumentedAttribute):
+            raise ValueError('{} has no column {}'.format(cls.__name__, attr))
+        return column
+
+    def execute(self, query, count=False):
+        """
+        Runs a query as a single SQL statement.
+
+        The conditions become the WHERE clause, the sort keys the ORDER BY
+        clause (NULL values last, as FileStorage does) and the limit and
+        offset the LIMIT and OFFSET clauses.
+
+        Args:
+            query (Query): The query.
+            count (bool, optional): Return the number of matching objects,
+                ignoring limit and offset. Defaults to False.
+
+        Returns:
+            list: The matching objects, or their number when count is True.
+
+        Raises:
+            ValueError: If an attribute of the query is not a column.
+        """
+        cls = query.cls
+        clauses = []
+        for condition in query.conditions:
+            column = self.__column(cls, condition.attr)
+            if condition.op == 'in':
+                clauses.append(column.in_(condition.value))
+            else:
+                clauses.append(
+                    OPERATORS[condition.op](column, condition.value))
+        if count:
+            return self.__session.execute(
+                select(func.count()).select_from(cls).where(*clauses)
+            ).scalar()
+        statement = select(cls).where(*clauses).options(
+            *self.__load_options(cls))
+        for attr, descending in query.ordering:
+            column = self.__column(cls, attr)
+            statement = statement.order_by(
+                column.is_(None), column.desc() if descending else column)
+        if query.offset_count:
+            statement = statement.offset(query.offset_count)
+        if query.limit_count is not None:
+            statement = statement.limit(query.limit_count)
+        return self.__session.scalars(statement).all()
+
+    def count(self, cls=None):
+        """
+        Returns the number of objects in the database.
+
+        Args:
+            cls (class or str, optional): The class to count, with its
+                subclasses, or the name of a class to count without its
+                subclasses. Defaults to None, all objects.
+
+        Returns:
+            int: The number of objects.
+        """
+        classes = self.all_classes if cls is None else self.__classes_of(cls)
+        return sum(
+            self.__session.execute(
+                select(func.count()).select_from(class_type)).scalar()
+            for class_type in classes
+        )
+
+    def iter(self, cls=None, batch_size=1000, after_key=None, load=None):
+        """
+        Iterates over the objects in the database in a stable order.
+
+        The objects are yielded by class name, then by id, which is the
+        order of their <class name>.<id> keys. Each table is read with
+        keyset pagination, batch_size rows at a time, so only one batch
+        is held by the session at once.
+
+        Args:
+            cls (class or str, optional): The class to iterate over, with
+                its subclasses, or the name of a class to iterate over
+                without its subclasses. Defaults to None, all objects.
+            batch_size (int, optional): The number of rows read at a time.
+                Defaults to 1000.
+            after_key (str, optional): Resume after this <class name>.<id>
+                key, e.g. the key of the last object of a previous page.
+            load (list, optional): The relationship paths to load eagerly
+                with each batch. Defaults to None, the HBNB_DB_EAGER paths.
+
+        Yields:
+            BaseModel: The objects.
+        """
+        classes = self.all_classes if cls is None else self.__classes_of(cls)
+        after_cls, _, after_id = (after_key or '').partition('.')
+        for class_type in sorted(classes, key=lambda c: c.__name__):
+            if class_type.__name__ < after_cls:
+                continue
+            last_id = after_id if class_type.__name__ == after_cls else None
+            options = self.__load_options(class_type, load, cls is not None)
+            while True:
+                query = select(class_type).options(*options).order_by(
+                    class_type.id)
+                if last_id is not None:
+                    query = query.where(class_type.id > last_id)
+                rows = self.__session.scalars(query.limit(batch_size)).all()
+                yield from rows
+                if len(rows) < batch_size:
+                    break
+                last_id = rows[-1].id
+
     def delete(self, obj=None):
         """
         Removes an object from the storage database.
@@ -73,40 +732,174 @@ class DBStorage:
             obj (BaseModel, optional): The object to delete. Defaults to None.
         """
         if obj is not None:
+            self.__invalidate(obj)
+            with self.__text_lock:
+                if self.__text is not None:
+                    self.__text.remove(type(obj).__name__ + '.' + obj.id)
             self.__session.query(type(obj)).filter(
                 type(obj).id == obj.id).delete(
                 synchronize_session=False
             )
 
+    @staticmethod
+    def __unique_values(objs):
+        """
+        Collects the values of the unique columns set on objects.
+
+        They are read before a flush, which expires the objects when it
+        fails. The primary keys are left out.
+
+        Args:
+            objs (list): The objects being added.
+
+        Returns:
+            list: The (class, attribute, value, id) of each non-empty
+                unique value.
+        """
+        values = []
+        for obj in objs:
+            for column in type(obj).__table__.columns:
+                if column.unique and not column.primary_key:
+                    value = obj.__dict__.get(column.key)
+                    if isinstance(value, str) and value:
+                        values.append((type(obj), column.key, value,
+                                       obj.__dict__.get('id')))
+        return values
+
+    def __reject(self, values, error):
+        """
+        Rolls back a failed flush and tells which unique value was taken.
+
+        The unique values are looked up among the other rows, so the error
+        reads as the one FileStorage raises.
+
+        Args:
+            values (list): The unique values of the objects, as returned
+                by __unique_values() before the flush.
+            error (IntegrityError): The error raised by the flush.
+
+        Raises:
+            ValueError: If a unique value is held by another row, or by
+                two of the objects.
+            IntegrityError: If the error is not about a unique value.
+        """
+        self.__session.rollback()
+        seen = set()
+        for cls, attr, value, obj_id in values:
+            taken = (cls, attr, value) in seen or self.__session.execute(
+                select(cls.id).where(getattr(cls, attr) == value,
+                                     cls.id != obj_id).limit(1)
+            ).first() is not None
+            if taken:
+                raise ValueError('{}.{} already exists: {}'.format(
+                    cls.__name__, attr, value)) from error
+            seen.add((cls, attr, value))
+        raise error
+
     def new(self, obj):
         """
         Adds a new object to the storage database.
 
         Args:
             obj (BaseModel): The object to add.
+
+        Raises:
+            ValueError: If a unique value of the object is held by
+                another object.
         """
         if obj is not None:
+            self.__invalidate(obj)
+            values = self.__unique_values([obj])
             try:
                 self.__session.add(obj)
                 self.__session.flush()
                 self.__session.refresh(obj)
+            except IntegrityError as ex:
+                self.__reject(values, ex)
             except Exception as ex:
                 self.__session.rollback()
                 raise ex
 
+    def new_many(self, objs):
+        """
+        Adds several objects to the storage database.
+
+        The objects are inserted with a single flush, which sends the
+        rows of each table as one multi-row INSERT, instead of the flush
+        and refresh round trips new() does for every object.
+
+        Args:
+            objs (iterable): The objects to add.
+
+        Raises:
+            ValueError: If a unique value of an object is held by another
+                object, no object is added then.
+        """
+        objs = list(objs)
+        self.__invalidate(*objs)
+        values = self.__unique_values(objs)
+        try:
+            self.__session.add_all(objs)
+            self.__session.flush()
+        except IntegrityError as ex:
+            self.__reject(values, ex)
+        except Exception as ex:
+            self.__session.rollback()
+            raise ex
+
+    def save_many(self, objs):
+        """
+        Saves several objects with a single flush and commit.
+
+        This does what calling save() on each object does: updated_at
+        is set to the current time and the object is added to storage.
+
+        Args:
+            objs (iterable): The objects to save.
+        """
+        objs = list(objs)
+        now = datetime.now()
+        for obj in objs:
+            obj.updated_at = now
+        self.new_many(objs)
+        self.save()
+
     def save(self):
         """Commits the session changes to the database."""
+        session = self.__session
+        self.__invalidate(*session.new, *session.dirty, *session.deleted)
+        session.commit()
+
+    def flush(self):
+        """
+        Commits the session changes to the database.
+
+        DBStorage writes on every save(), this matches FileStorage.flush().
+        """
         self.__session.commit()
 
     def reload(self):
         """Loads the storage database."""
+        if self.cache is not None:
+            self.cache.clear()
+        for name in list(self.__generations) + [
+                class_type.__name__ for class_type in self.all_classes]:
+            self.__generations[name] = self.generation(name) + 1
+        with self.__text_lock:
+            self.__text = None
         Base.metadata.create_all(self.__engine)
         SessionFactory = sessionmaker(
             bind=self.__engine,
             expire_on_commit=False
         )
-        self.__session = scoped_session(SessionFactory)()
+        event.listen(SessionFactory, 'after_flush', self.__index_flushed)
+        self.__session = scoped_session(SessionFactory)
 
     def close(self):
-        """Closes the storage engine."""
-        self.__session.close()
+        """
+        Closes the session of the current thread.
+
+        The session is returned to the registry and its connection to the
+        pool, the next call from this thread starts a new session.
+        """
+        self.__session.remove()
@@ -2,19 +2,177 @@
 """
 This module defines a class to manage file storage for the hbnb clone.
 """
+import atexit
+import bisect
+import heapq
 import json
+import math
 import os
+import threading
+import zlib
+from collections.abc import ItemsView, ValuesView
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from importlib import import_module
+from itertools import islice
+from types import MappingProxyType
+
+from models.engine.geo import GridIndex, bounding_box, distance_km
+from models.engine.journal import Journal
+from models.engine.json_stream import dump_encoded, iter_items
+from models.engine.query import Query
+from models.engine.search import TEXT_FIELDS, TextIndex, document_text
+from models.engine.snapshot_cache import SnapshotCache
+from models.engine.sorted_index import SortedIndex
+
+
+class LazyObjects(dict):
+    """
+    A storage dictionary that builds its objects on first access.
+
+    Values are either model instances or the raw dictionaries read from
+    the storage file. Reading a raw value through [], get(), values() or
+    items() builds the instance with the build function, which stores it
+    back in place of the raw dictionary.
+    """
+
+    def __init__(self, build):
+        """
+        Initializes a LazyObjects instance.
+
+        Args:
+            build (callable): Called with a key and its raw dictionary,
+                returns the model instance.
+        """
+        super().__init__()
+        self.build = build
+
+    def __getitem__(self, key):
+        """Returns the object stored under key, building it if needed."""
+        value = super().__getitem__(key)
+        if type(value) is dict:
+            value = self.build(key, value)
+        return value
+
+    def __iter__(self):
+        """
+        Iterates over the keys.
+
+        Overriding __iter__ makes dict(), {**objects} and dict.update()
+        read the values through __getitem__ instead of the raw storage.
+        """
+        return super().__iter__()
+
+    def get(self, key, default=None):
+        """Returns the object stored under key, or default."""
+        if key in self:
+            return self[key]
+        return default
+
+    def values(self):
+        """Returns a view of the objects, built as they are read."""
+        return ValuesView(self)
+
+    def items(self):
+        """Returns a view of the (key, object) pairs, built when read."""
+        return ItemsView(self)
+
+    def copy(self):
+        """Returns a plain dictionary of all the objects, built."""
+        return dict(self.items())
 
 
 class FileStorage:
     """
     This class manages the storage of hbnb models in JSON format.
+
+    The HBNB_FILE_MODE environment variable selects how changes are
+    written to disk: 'snapshot' (the default) rewrites the whole file on
+    every save, 'journal' appends the changed objects to a log next to
+    the file and replays it on reload. The journal is folded back into
+    the file by checkpoint(), which save() runs in the background once
+    the journal grows past its thresholds. 'sharded' splits the storage
+    into files in the file.json.d directory, one per class or, with
+    HBNB_FILE_SHARD_BY=hash, one per HBNB_FILE_SHARD_COUNT hash bucket
+    of the key. save() only rewrites the shards holding changed objects
+    and reload() reads the shards in parallel, only the classes listed
+    in HBNB_FILE_LOAD when it is set.
+
+    Alongside __objects, the objects are kept in one bucket per class so
+    that all(cls) only visits the buckets of cls and its subclasses, and
+    the foreign keys listed in foreign_keys are indexed in reverse so
+    that related() answers the file-mode relationship properties.
+    The coordinates listed in geo_fields are kept in a GridIndex of
+    HBNB_GEO_CELL_DEG degrees (0.1 by default) per class, built by the
+    first call to places_near() or places_in_bbox(), which then answer
+    without scanning every Place.
+    The attributes listed in unique_fields map each non-empty value to
+    the one object holding it, from the first get_by() or uniqueness
+    check on: new() and new_many() raise a ValueError for an object
+    taking a value held by another, and get_by() reads them with a
+    single lookup.
+    The numeric attributes listed in sorted_fields are kept in a
+    SortedIndex each, which query() reads for range conditions and, in
+    order, for an order_by on the attribute, so a limited query stops
+    after limit matches instead of sorting. They are built by the first
+    query using them, then kept up to date by new() and delete().
+    search() ranks the places and reviews matching a text with a BM25
+    TextIndex built on first use and kept up to date by new() and
+    delete(). It is written to file.json.search on save when it changed,
+    and checked against the checksum of each document when read back, so
+    only the documents changed in the meantime are indexed again.
+    Every class also has a generation counter that new(), delete() and
+    reload() increment for the classes of the objects they add or
+    remove, and for their base classes. all(cls) keeps its last result
+    and returns it again while the generation of cls is unchanged.
+
+    The JSON encoding of every saved object is cached, save() only
+    encodes again the objects that are dirty (see BaseModel.is_dirty).
+    An object changed without setattr(), e.g. through its __dict__, has
+    to be marked with BaseModel.mark_dirty() to be written again.
+
+    With HBNB_FILE_HYDRATE=lazy, reload() keeps the raw dictionaries
+    read from disk and an object is only built when it is first read
+    from all(), all(cls) or related() (see LazyObjects).
+
+    With HBNB_FILE_CACHE=on, reload() reads the entries of the file from
+    the marshal cache file.json.cache while it matches file.json, and
+    rebuilds the cache when it does not (see SnapshotCache).
+
+    The HBNB_FILE_SYNC environment variable selects when save() writes
+    to disk: 'always' (the default) writes on every save, 'interval'
+    groups the saves made within HBNB_FILE_SYNC_MS milliseconds, or up
+    to HBNB_FILE_SYNC_BATCH saves, into one write, and 'close' only
+    writes on flush(), close() and at exit.
     """
 
     __file_path = 'file.json'
     __objects = {}
 
+    # Foreign key attributes indexed in reverse, by class name
+    foreign_keys = {
+        'City': ('state_id',),
+        'Place': ('city_id', 'user_id'),
+        'Review': ('place_id', 'user_id')
+    }
+
+    # Attributes whose non-empty values identify one object, by class name
+    unique_fields = {
+        'User': ('email',)
+    }
+
+    # Numeric attributes kept in sorted indexes, by class name. A tuple
+    # indexes the last attribute within each value of the first ones.
+    sorted_fields = {
+        'Place': ('price_by_night', 'max_guest', 'number_rooms',
+                  ('city_id', 'price_by_night'))
+    }
+
+    # Latitude and longitude attributes indexed in a grid, by class name
+    geo_fields = {
+        'Place': ('latitude', 'longitude')
+    }
+
     def __init__(self):
         """Initializes a FileStorage instance."""
         self.model_classes = {
@@ -26,26 +184,1027 @@ class FileStorage:
             'Place': import_module('models.place').Place,
             'Review': import_module('models.review').Review
         }
+        self.mode = os.getenv('HBNB_FILE_MODE', 'snapshot')
+        self.journal = Journal(self.__file_path + '.log')
+        self.shard_dir = self.__file_path + '.d'
+        self.shard_by = os.getenv('HBNB_FILE_SHARD_BY', 'class')
+        self.shard_count = int(os.getenv('HBNB_FILE_SHARD_COUNT', 16))
+        load = os.getenv('HBNB_FILE_LOAD')
+        self.shards_to_load = load.split(',') if load else None
+        self.lazy = os.getenv('HBNB_FILE_HYDRATE') == 'lazy'
+        self.search_path = self.__file_path + '.search'
+        self.geo_cell_deg = float(os.getenv('HBNB_GEO_CELL_DEG', 0.1))
+        self.cache = None
+        if os.getenv('HBNB_FILE_CACHE') == 'on':
+            self.cache = SnapshotCache(self.__file_path + '.cache',
+                                       self.__file_path)
+        self.sync = os.getenv('HBNB_FILE_SYNC', 'always')
+        self.sync_ms = int(os.getenv('HBNB_FILE_SYNC_MS', 1000))
+        self.sync_batch = int(os.getenv('HBNB_FILE_SYNC_BATCH', 1000))
+        self.__pending = {}
+        self.__loaded_shards = set()
+        self.__dirty_shards = set()
+        self.__unflushed = 0
+        self.__timer = None
+        self.__lock = threading.RLock()
+        self.__reindex()
+        if self.sync != 'always':
+            atexit.register(self.__flush_unflushed)
+
+    def __reindex(self):
+        """Rebuilds the class buckets and the reverse foreign-key indexes."""
+        if self.lazy and not isinstance(self.__objects, LazyObjects):
+            objects = LazyObjects(self.__hydrate)
+            dict.update(objects, self.__objects)
+            self.__objects = objects
+        self.__fragments = {}
+        self.__buckets = {}
+        self.__generations = {}
+        self.__all_cache = {}
+        self.__grids = None
+        self.__sorted = None
+        self.__text = None
+        self.__text_synced = False
+        self.__refs = {}
+        self.__ref_values = {}
+        self.__unique = None
+        self.__unique_values = {}
+        self.__shards = {}
+        for key, obj in dict.items(self.__objects):
+            self.__buckets.setdefault(self.__type_of(obj), {})[key] = obj
+            self.__link(key, obj)
+            if self.mode == 'sharded':
+                self.__shards.setdefault(self.shard_of(key), {})[key] = obj
+
+    def __type_of(self, obj):
+        """
+        Returns the class of an object or of a raw dictionary.
+
+        Args:
+            obj (BaseModel or dict): The object, or its raw dictionary.
+
+        Returns:
+            class: The model class.
+        """
+        if type(obj) is dict:
+            return self.model_classes[obj['__class__']]
+        return type(obj)
+
+    def __link(self, key, obj):
+        """
+        Adds an object to the reverse foreign-key indexes.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+            obj (BaseModel): The object to index.
+        """
+        cls_name = key.partition('.')[0]
+        attrs = self.foreign_keys.get(cls_name)
+        if not attrs:
+            return
+        if type(obj) is dict:
+            values = tuple(obj.get(attr) for attr in attrs)
+        else:
+            values = tuple(getattr(obj, attr, None) for attr in attrs)
+        self.__ref_values[key] = values
+        for attr, value in zip(attrs, values):
+            index = self.__refs.setdefault((cls_name, attr), {})
+            index.setdefault(value, {})[key] = obj
+
+    def __unlink(self, key):
+        """
+        Removes an object from the reverse foreign-key indexes.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+        """
+        values = self.__ref_values.pop(key, None)
+        if values is None:
+            return
+        cls_name = key.partition('.')[0]
+        for attr, value in zip(self.foreign_keys[cls_name], values):
+            index = self.__refs[(cls_name, attr)]
+            index[value].pop(key, None)
+            if not index[value]:
+                del index[value]
+
+    def __unique_of(self, key, obj):
+        """
+        Returns the unique values of an object.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+            obj (BaseModel or dict): The object, or its raw dictionary.
+
+        Returns:
+            tuple: The (attribute, value) pairs of its non-empty strings.
+        """
+        attrs = self.unique_fields.get(key.partition('.')[0], ())
+        if type(obj) is dict:
+            values = ((attr, obj.get(attr)) for attr in attrs)
+        else:
+            values = ((attr, getattr(obj, attr, None)) for attr in attrs)
+        return tuple((attr, value) for attr, value in values
+                     if isinstance(value, str) and value)
+
+    def __check_unique(self, items):
+        """
+        Checks that objects do not take the unique values of others.
+
+        The changed objects are only indexed again when one of the
+        objects holds a unique value.
+
+        Args:
+            items (list): The (key, object) pairs about to be stored.
+
+        Raises:
+            ValueError: If a unique value is held by another object, or
+                by two of the objects.
+        """
+        items = [(key, self.__unique_of(key, obj)) for key, obj in items]
+        if not any(values for _, values in items):
+            return
+        self.__refresh_dirty()
+        taken = {}
+        for key, values in items:
+            cls_name = key.partition('.')[0]
+            for attr, value in values:
+                owner = taken.setdefault((cls_name, attr, value), key)
+                if owner == key:
+                    owner = self.__unique_index(cls_name, attr).get(
+                        value, key)
+                if owner != key:
+                    raise ValueError('{}.{} already exists: {}'.format(
+                        cls_name, attr, value))
+
+    def __claim(self, key, obj):
+        """
+        Adds the unique values of an object to the unique indexes.
+
+        A value already held by another object is left to it. Nothing is
+        done until the unique indexes were built.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+            obj (BaseModel): The object to index.
+        """
+        if self.__unique is None:
+            return
+        values = self.__unique_of(key, obj)
+        if not values:
+            return
+        cls_name = key.partition('.')[0]
+        self.__unique_values[key] = values
+        for attr, value in values:
+            self.__unique.setdefault((cls_name, attr), {}).setdefault(
+                value, key)
+
+    def __unique_index(self, cls_name, attr):
+        """
+        Returns a unique index, building the unique indexes on first use.
+
+        Args:
+            cls_name (str): The class name.
+            attr (str): The unique attribute.
+
+        Returns:
+            dict: The key of the object holding each value.
+        """
+        if self.__unique is None:
+            self.__unique = {}
+            for name in self.unique_fields:
+                bucket = self.__buckets.get(self.model_classes[name], {})
+                for key, obj in list(bucket.items()):
+                    self.__claim(key, obj)
+        return self.__unique.get((cls_name, attr), {})
+
+    def __release(self, key):
+        """
+        Removes the unique values of an object from the unique indexes.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+        """
+        values = self.__unique_values.pop(key, None)
+        if values is None:
+            return
+        cls_name = key.partition('.')[0]
+        for attr, value in values:
+            index = self.__unique[(cls_name, attr)]
+            if index.get(value) == key:
+                del index[value]
+
+    def __locate(self, key, obj):
+        """
+        Updates the position of an object in the grid index of its class.
+
+        Nothing is done until the grid indexes were built.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+            obj (BaseModel): The object, or None to remove it.
+        """
+        if self.__grids is None:
+            return
+        cls_name = key.partition('.')[0]
+        attrs = self.geo_fields.get(cls_name)
+        if not attrs:
+            return
+        grid = self.__grids.get(cls_name)
+        if grid is None:
+            grid = self.__grids[cls_name] = GridIndex(self.geo_cell_deg)
+        if obj is None:
+            grid.remove(key)
+            return
+        if type(obj) is dict:
+            lat, lon = (obj.get(attr) for attr in attrs)
+        else:
+            lat, lon = (getattr(obj, attr, None) for attr in attrs)
+        try:
+            grid.add(key, float(lat), float(lon))
+        except (TypeError, ValueError):
+            grid.remove(key)
+
+    def __rank(self, key, obj):
+        """
+        Updates the values of an object in the sorted indexes of its class.
+
+        Only numbers are indexed, along with strings for the leading
+        attributes of a composite index; other values count as missing.
+        In a composite index the objects missing the last value are
+        indexed under their leading values alone, which sort first.
+        Nothing is done until the indexes were built.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+            obj (BaseModel): The object, or None to remove it.
+        """
+        if self.__sorted is None:
+            return
+        cls_name = key.partition('.')[0]
+        fields = self.sorted_fields.get(cls_name)
+        if not fields:
+            return
+        indexes = self.__sorted.setdefault(cls_name, {})
+        for field in fields:
+            attrs = field if isinstance(field, tuple) else (field,)
+            index = indexes.get(attrs)
+            if index is None:
+                index = indexes[attrs] = SortedIndex()
+            if obj is None:
+                index.remove(key)
+                continue
+            if type(obj) is dict:
+                values = tuple(obj.get(attr) for attr in attrs)
+            else:
+                values = tuple(getattr(obj, attr, None) for attr in attrs)
+            if any(type(value) is not str for value in values[:-1]):
+                index.add(key, None)
+            elif type(values[-1]) not in (int, float):
+                index.add(key, values[:-1] or None)
+            else:
+                index.add(key, values if len(values) > 1 else values[0])
+
+    def __grid(self, cls_name):
+        """
+        Returns the grid index of a class, building the grids on first use.
+
+        Args:
+            cls_name (str): The name of a class listed in geo_fields.
+
+        Returns:
+            GridIndex: The index, or None if no object was located.
+        """
+        if self.__grids is None:
+            self.__grids = {}
+            for name in self.geo_fields:
+                bucket = self.__buckets.get(self.model_classes[name], {})
+                for key, obj in list(bucket.items()):
+                    self.__locate(key, obj)
+        return self.__grids.get(cls_name)
+
+    def __sorted_indexes(self):
+        """
+        Returns the sorted indexes, building them on first use.
+
+        The values are collected from the class buckets and each index is
+        sorted once, on its first lookup (see SortedIndex).
+
+        Returns:
+            dict: The SortedIndex of each attribute tuple, by class name.
+        """
+        if self.__sorted is None:
+            self.__sorted = {}
+            for cls_name in self.sorted_fields:
+                bucket = self.__buckets.get(self.model_classes[cls_name], {})
+                for key, obj in list(bucket.items()):
+                    self.__rank(key, obj)
+        return self.__sorted
+
+    def __index_text(self, key, obj):
+        """
+        Updates the text of an object in the text index.
+
+        Nothing is done until the index was synced with the objects.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+            obj (BaseModel): The object, or None to remove it.
+        """
+        if not self.__text_synced:
+            return
+        fields = TEXT_FIELDS.get(key.partition('.')[0])
+        if not fields:
+            return
+        if obj is None:
+            self.__text.remove(key)
+        else:
+            self.__text.add(key, document_text(obj, fields))
+
+    def __text_index(self):
+        """
+        Returns the text index, reading or building it on first use.
+
+        Returns:
+            TextIndex: The index, synced with the stored objects.
+        """
+        if self.__text is None:
+            self.__text = TextIndex.load(self.search_path) or TextIndex()
+        if not self.__text_synced:
+            self.__text.sync(
+                (key, document_text(obj, fields))
+                for cls_name, fields in TEXT_FIELDS.items()
+                for key, obj in list(self.__buckets.get(
+                    self.model_classes[cls_name], {}).items())
+            )
+            self.__text_synced = True
+        return self.__text
+
+    def __refresh_dirty(self):
+        """
+        Takes the stored objects changed since they were stored or indexed.
+
+        Attributes set on a stored object without passing it to new()
+        again are only seen by the indexes once this runs, which is done
+        before they are read. The objects are taken from BaseModel with
+        drain_dirty() and added to the pending changes, with their cached
+        encoding dropped, so the next write still includes them.
+        """
+        claims = []
+        for obj in self.model_classes['BaseModel'].drain_dirty():
+            key = '{}.{}'.format(type(obj).__name__, getattr(obj, 'id', None))
+            if dict.get(self.__objects, key) is not obj:
+                continue
+            self.__fragments.pop(key, None)
+            self.__pending.setdefault(key, obj)
+            attrs = self.foreign_keys.get(key.partition('.')[0], ())
+            if tuple(getattr(obj, attr, None) for attr in attrs) != \
+                    self.__ref_values.get(key, ()):
+                self.__unlink(key)
+                self.__link(key, obj)
+            if self.__unique is not None and \
+                    self.__unique_of(key, obj) != \
+                    self.__unique_values.get(key, ()):
+                self.__release(key)
+                claims.append((key, obj))
+            self.__locate(key, obj)
+            self.__rank(key, obj)
+        for key, obj in claims:
+            self.__claim(key, obj)
+
+    def __touch(self, cls):
+        """
+        Increments the generation of a class and of its base classes.
+
+        Args:
+            cls (class): The class of an object added or removed.
+        """
+        for base in cls.__mro__:
+            self.__generations[base] = self.__generations.get(base, 0) + 1
+
+    def __put(self, key, obj, touch=True):
+        """
+        Stores an object in the storage dictionary and its class bucket.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+            obj (BaseModel): The object to store.
+            touch (bool, optional): Increment the generation of its class
+                unless the object is already stored. Defaults to True,
+                False when a raw dictionary is replaced by the object
+                built from it, which is then only counted as a change if
+                another instance was stored.
+        """
+        obj_type = self.__type_of(obj)
+        old = dict.get(self.__objects, key)
+        if old is not obj and (touch or (old is not None and
+                                         type(old) is not dict)):
+            self.__touch(obj_type)
+        if old is not None and self.__type_of(old) is not obj_type:
+            self.__touch(self.__type_of(old))
+            self.__buckets.get(self.__type_of(old), {}).pop(key, None)
+        self.__unlink(key)
+        self.__release(key)
+        self.__fragments.pop(key, None)
+        dict.__setitem__(self.__objects, key, obj)
+        self.__buckets.setdefault(obj_type, {})[key] = obj
+        self.__link(key, obj)
+        self.__claim(key, obj)
+        self.__locate(key, obj)
+        self.__rank(key, obj)
+        if touch:
+            self.__index_text(key, obj)
+        if type(obj) is not dict:
+            obj.mark_clean()
+        if self.mode == 'sharded':
+            self.__shards.setdefault(self.shard_of(key), {})[key] = obj
+
+    def __drop(self, key):
+        """
+        Removes an object from the storage dictionary and its class bucket.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+
+        Returns:
+            bool: True if an object was removed.
+        """
+        obj = dict.pop(self.__objects, key, None)
+        if obj is None:
+            return False
+        self.__touch(self.__type_of(obj))
+        self.__buckets.get(self.__type_of(obj), {}).pop(key, None)
+        self.__unlink(key)
+        self.__release(key)
+        self.__locate(key, None)
+        self.__rank(key, None)
+        self.__index_text(key, None)
+        self.__fragments.pop(key, None)
+        if self.mode == 'sharded':
+            self.__shards.get(self.shard_of(key), {}).pop(key, None)
+        return True
+
+    def __load(self, key, val):
+        """
+        Builds an object read from the storage file and stores it.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+            val (dict): The dictionary representation of the object.
+        """
+        if val['__class__'] in self.model_classes:
+            if self.lazy:
+                self.__put(key, val)
+            else:
+                self.__hydrate(key, val)
+
+    def __hydrate(self, key, val):
+        """
+        Builds an object from its raw dictionary and stores it.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+            val (dict): The dictionary representation of the object.
+
+        Returns:
+            BaseModel: The object.
+        """
+        obj = self.model_classes[val['__class__']](**val)
+        obj.mark_clean()
+        fragment = self.__fragments.get(key)
+        self.__put(key, obj, touch=False)
+        if fragment is not None:
+            self.__fragments[key] = fragment
+        return obj
+
+    def __encoded(self, items):
+        """
+        Encodes objects, reusing the cached encodings.
+
+        Args:
+            items (iterable): The (key, object) pairs to encode.
+
+        Yields:
+            tuple: The (key, JSON text) pairs of the objects.
+        """
+        fragments = self.__fragments
+        for key, obj in items:
+            fragment = fragments.get(key)
+            if type(obj) is dict:
+                if fragment is None:
+                    fragment = fragments[key] = json.dumps(obj)
+            elif fragment is None or obj.is_dirty():
+                fragment = fragments[key] = json.dumps(obj.to_dict())
+                obj.mark_clean()
+            yield key, fragment
+
+    def __changes(self):
+        """
+        Collects the objects changed since the last write.
+
+        Returns:
+            dict: The objects passed to new() or dirty since the last
+                save by key, None for the deleted ones.
+        """
+        self.__refresh_dirty()
+        changes, self.__pending = self.__pending, {}
+        return changes
+
+    def generation(self, cls):
+        """
+        Returns the generation counter of a class.
+
+        It changes whenever an object of cls or of a subclass is added to
+        or removed from storage, so results computed from the objects of
+        cls can be kept while it is unchanged.
+
+        Args:
+            cls (class or str): The class, or its name.
+
+        Returns:
+            int: The generation of cls.
+        """
+        if isinstance(cls, str):
+            cls = self.model_classes.get(cls)
+        return self.__generations.get(cls, 0)
 
-    def all(self, cls=None):
+    def all(self, cls=None, load=None, stream=False):
         """
         Returns a dictionary of models currently in storage.
 
+        The mapping returned for a class is a read-only view shared by
+        the calls made until its generation changes.
+
         Args:
-            cls (class, optional): The class to filter the objects. Defaults to None.
+            cls (class, optional): The class to filter the objects.
+                Defaults to None.
+            load (list, optional): Accepted for compatibility with DBStorage,
+                the relationships are answered from in-memory indexes.
+            stream (bool, optional): Accepted for compatibility with
+                DBStorage, the objects are already in memory.
 
         Returns:
-            dict: A dictionary of objects in storage.
+            dict: A dictionary of objects in storage, a read-only
+                mapping of them when cls is given.
         """
         if cls is None:
-            return FileStorage.__objects
-        # Access the class-level attribute correctly
+            return self.__objects
+        generation = self.__generations.get(cls, 0)
+        cached = self.__all_cache.get(cls)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        buckets = [bucket for bucket_cls, bucket in self.__buckets.items()
+                   if issubclass(bucket_cls, cls)]
+        if self.lazy:
+            filtered_dict = {key: self.__objects[key]
+                             for bucket in buckets for key in bucket}
+        elif len(buckets) == 1:
+            filtered_dict = dict(buckets[0])
         else:
             filtered_dict = {}
-            for key, value in FileStorage.__objects.items():
-                if isinstance(value, cls):
-                    filtered_dict[key] = value
-            return filtered_dict
+            for bucket in buckets:
+                filtered_dict.update(bucket)
+        filtered_dict = MappingProxyType(filtered_dict)
+        self.__all_cache[cls] = (generation, filtered_dict)
+        return filtered_dict
+
+    def related(self, cls, attr, value):
+        """
+        Returns the objects of a class that reference a given object.
+
+        The reverse foreign-key index is updated when an object is passed
+        to new(), which BaseModel.save() does, and for the stored objects
+        changed since they were saved before it is read.
+
+        Args:
+            cls (class): The class of the referencing objects.
+            attr (str): The foreign key attribute, e.g. 'state_id'.
+            value (str): The id of the referenced object.
+
+        Returns:
+            list: The objects of cls whose attr is value.
+        """
+        with self.__lock:
+            self.__refresh_dirty()
+        index = self.__refs.get((cls.__name__, attr))
+        if index is None:
+            candidates = self.all(cls).values()
+        else:
+            keys = list(index.get(value, {}))
+            candidates = [self.__objects[key] for key in keys]
+        return [obj for obj in candidates if getattr(obj, attr, None) == value]
+
+    def places_in_bbox(self, min_lat, min_lon, max_lat, max_lon,
+                       limit=None):
+        """
+        Returns the places inside a latitude/longitude box.
+
+        Args:
+            min_lat (float): The southern latitude of the box.
+            min_lon (float): The western longitude of the box, greater
+                than max_lon for a box crossing the 180th meridian.
+            max_lat (float): The northern latitude of the box.
+            max_lon (float): The eastern longitude of the box.
+            limit (int, optional): The maximum number of places.
+                Defaults to None, no limit.
+
+        Returns:
+            list: The places, ordered by id.
+        """
+        with self.__lock:
+            grid = self.__grid('Place')
+            self.__refresh_dirty()
+        if grid is None:
+            return []
+        keys = sorted(key for key, _, _ in
+                      grid.in_box(min_lat, min_lon, max_lat, max_lon))
+        places = []
+        for key in keys:
+            place = self.__objects.get(key)
+            if place is not None:
+                places.append(place)
+                if len(places) == limit:
+                    break
+        return places
+
+    def places_near(self, lat, lon, radius_km, limit=None):
+        """
+        Returns the places within a distance of a point, nearest first.
+
+        Only the grid cells overlapping the bounding box of the circle
+        are visited, the exact distance is checked for the places in it.
+
+        Args:
+            lat (float): The latitude of the point, in degrees.
+            lon (float): The longitude of the point, in degrees.
+            radius_km (float): The search radius in kilometers.
+            limit (int, optional): The maximum number of places.
+                Defaults to None, no limit.
+
+        Returns:
+            list: The places, ordered by distance.
+        """
+        with self.__lock:
+            grid = self.__grid('Place')
+            self.__refresh_dirty()
+        if grid is None:
+            return []
+        found = []
+        for key, place_lat, place_lon in grid.in_box(
+                *bounding_box(lat, lon, radius_km)):
+            distance = distance_km(lat, lon, place_lat, place_lon)
+            if distance <= radius_km:
+                found.append((distance, key))
+        if limit is None:
+            found.sort()
+        else:
+            found = heapq.nsmallest(limit, found)
+        places = (self.__objects.get(key) for _, key in found)
+        return [place for place in places if place is not None]
+
+    def search(self, text, cls=None, limit=10):
+        """
+        Returns the places and reviews best matching a text.
+
+        Args:
+            text (str): The words to search for.
+            cls (class or str, optional): Place or Review to only search
+                one of them. Defaults to None, both.
+            limit (int, optional): The maximum number of objects.
+                Defaults to 10, None for no limit.
+
+        Returns:
+            list: The objects, best match first.
+
+        Raises:
+            ValueError: If the text of the class is not indexed.
+        """
+        prefix = ''
+        if cls is not None:
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            if cls_name not in TEXT_FIELDS:
+                raise ValueError('No text index for ' + cls_name)
+            prefix = cls_name + '.'
+        with self.__lock:
+            ranked = self.__text_index().search(text, limit, prefix)
+        objs = (self.__objects.get(key) for key, _ in ranked)
+        return [obj for obj in objs if obj is not None]
+
+    def get_by(self, cls, **conditions):
+        """
+        Returns the first object of a class matching some conditions.
+
+        Args:
+            cls (class or str): The class of the object, or its name.
+            **conditions: The conditions, as for Query.filter(), e.g.
+                email='a@b.c'.
+
+        Returns:
+            BaseModel: The object, or None if none matches.
+        """
+        return self.query(cls).filter(**conditions).first()
+
+    def query(self, cls):
+        """
+        Starts a query on the objects of a class (see Query).
+
+        Args:
+            cls (class or str): The class of the objects, with its
+                subclasses, or its name.
+
+        Returns:
+            Query: The query.
+
+        Raises:
+            ValueError: If the class does not exist.
+        """
+        if isinstance(cls, str):
+            if cls not in self.model_classes:
+                raise ValueError('Unknown class: ' + cls)
+            cls = self.model_classes[cls]
+        return Query(self, cls)
+
+    @staticmethod
+    def __bounds(query, attr):
+        """
+        Collects the range the conditions of a query put on an attribute.
+
+        Only the eq, lt, le, gt and ge conditions comparing attr with a
+        number are used, the others are left to Query.matches().
+
+        Args:
+            query (Query): The query.
+            attr (str): The attribute name.
+
+        Returns:
+            tuple: The (low, low_inclusive, high, high_inclusive) range,
+                None for an open end, or None if no condition applies.
+        """
+        low = high = None
+        low_inclusive = high_inclusive = True
+        found = False
+        for condition in query.conditions:
+            value = condition.value
+            if condition.attr != attr or type(value) not in (int, float):
+                continue
+            if condition.op in ('eq', 'gt', 'ge'):
+                inclusive = condition.op != 'gt'
+                if low is None or value > low or \
+                        (value == low and not inclusive):
+                    low, low_inclusive = value, inclusive
+                found = True
+            if condition.op in ('eq', 'lt', 'le'):
+                inclusive = condition.op != 'lt'
+                if high is None or value < high or \
+                        (value == high and not inclusive):
+                    high, high_inclusive = value, inclusive
+                found = True
+        if not found:
+            return None
+        return low, low_inclusive, high, high_inclusive
+
+    def __candidates(self, query):
+        """
+        Chooses the keys of the objects a query has to test.
+
+        Each index able to narrow the query proposes keys: an equality or
+        'in' condition on the id, a unique attribute or an indexed foreign
+        key, and the range the conditions put on the attribute of a sorted
+        index, within the equality conditions on the leading attributes of
+        a composite one. A sorted index on the only order_by attribute
+        proposes its keys in that order. The fewest keys are used, the
+        ordered ones on a tie, else all the objects of the class and its
+        subclasses.
+
+        Args:
+            query (Query): The query.
+
+        Returns:
+            tuple: The candidate keys, and True if they are in the order
+                of the query.
+        """
+        with self.__lock:
+            self.__refresh_dirty()
+        buckets = [(bucket_cls, bucket)
+                   for bucket_cls, bucket in list(self.__buckets.items())
+                   if issubclass(bucket_cls, query.cls)]
+        plans = [(sum(len(bucket) for _, bucket in buckets), True,
+                  lambda: [key for _, bucket in buckets
+                           for key in list(bucket)])]
+        for condition in query.conditions:
+            if condition.op not in ('eq', 'in'):
+                continue
+            values = condition.value if condition.op == 'in' \
+                else (condition.value,)
+            if condition.attr == 'id':
+                plans.append((len(values) * len(buckets), True,
+                              lambda values=values: [
+                                  bucket_cls.__name__ + '.' + str(value)
+                                  for bucket_cls, _ in buckets
+                                  for value in values]))
+            elif all(isinstance(value, str) and value
+                     for value in values) and \
+                    all(condition.attr in self.unique_fields.get(
+                        bucket_cls.__name__, ())
+                        for bucket_cls, _ in buckets):
+                with self.__lock:
+                    unique = [self.__unique_index(bucket_cls.__name__,
+                                                  condition.attr)
+                              for bucket_cls, _ in buckets]
+                plans.append((len(values) * len(buckets), True,
+                              lambda unique=unique, values=values: [
+                                  index[value] for index in unique
+                                  for value in values if value in index]))
+            elif all((bucket_cls.__name__, condition.attr) in self.__refs
+                     for bucket_cls, _ in buckets):
+                refs = [self.__refs[(bucket_cls.__name__, condition.attr)]
+                        for bucket_cls, _ in buckets]
+                plans.append((sum(len(index.get(value, ()))
+                                  for index in refs for value in values),
+                              True,
+                              lambda refs=refs, values=values: [
+                                  key for index in refs for value in values
+                                  for key in list(index.get(value, ()))]))
+        fields = self.sorted_fields.get(buckets[0][0].__name__, ()) \
+            if len(buckets) == 1 else ()
+        used = {condition.attr for condition in query.conditions}
+        used.update(attr for attr, _ in query.ordering)
+        if any(field in used or isinstance(field, tuple) and
+               field[-1] in used for field in fields):
+            with self.__lock:
+                indexes = self.__sorted_indexes().get(
+                    buckets[0][0].__name__, {})
+            for attrs, index in indexes.items():
+                plan = self.__range_plan(query, attrs, index)
+                if plan is not None:
+                    plans.append(plan)
+        _, unordered, keys = min(plans, key=lambda plan: plan[:2])
+        return keys(), not unordered
+
+    def __range_plan(self, query, attrs, index):
+        """
+        Proposes the keys of a sorted index for a query.
+
+        Args:
+            query (Query): The query.
+            attrs (tuple): The attributes of the index.
+            index (SortedIndex): The index.
+
+        Returns:
+            tuple: The (number of keys, False if they are in the order of
+                the query, function returning the keys) plan, or None if the
+                index does not narrow or order the query.
+        """
+        prefix = ()
+        for attr in attrs[:-1]:
+            values = [condition.value for condition in query.conditions
+                      if condition.attr == attr and condition.op == 'eq' and
+                      type(condition.value) is str]
+            if not values:
+                return None
+            prefix += (values[0],)
+        bounds = self.__bounds(query, attrs[-1])
+        ordered = len(query.ordering) == 1 and \
+            query.ordering[0][0] == attrs[-1]
+        if not prefix and bounds is None and not ordered:
+            return None
+        low, low_inclusive, high, high_inclusive = \
+            bounds or (None, True, None, True)
+        if prefix:
+            low = prefix + (-math.inf if low is None else low,)
+            high = prefix + (math.inf if high is None else high,)
+        start, stop = index.span(low, high, low_inclusive, high_inclusive)
+        reverse = ordered and query.ordering[0][1]
+        # Without a range on the attribute, the keys missing a value
+        # can match too, they come last as Query.sort() orders them
+        missing = []
+        if bounds is None:
+            missing = index.keys(*index.span(prefix, prefix)) if prefix \
+                else index.missing()
+        return (stop - start + len(missing), not ordered,
+                lambda: index.keys(start, stop, reverse) + missing)
+
+    def execute(self, query, count=False):
+        """
+        Runs a query against the storage dictionary and its indexes.
+
+        Without order_by, or when the candidate keys come from a sorted
+        index in the order of the query, the objects are tested one at a
+        time and the search stops once limit objects matched. Otherwise,
+        with a limit, only the best objects are kept while the others are
+        tested.
+
+        Args:
+            query (Query): The query.
+            count (bool, optional): Return the number of matching objects,
+                ignoring limit and offset. Defaults to False.
+
+        Returns:
+            list: The matching objects, or their number when count is True.
+        """
+        keys, ordered = self.__candidates(query)
+        objs = (self.__objects.get(key) for key in keys)
+        matches = (obj for obj in objs
+                   if obj is not None and query.matches(obj))
+        if count:
+            return sum(1 for _ in matches)
+        start = query.offset_count
+        stop = None
+        if query.limit_count is not None:
+            stop = start + query.limit_count
+        if query.ordering and not ordered:
+            if stop is None:
+                matches = query.sort(matches)
+            else:
+                matches = query.top(matches, stop)
+        return list(islice(matches, start, stop))
+
+    def get(self, cls, id):
+        """
+        Returns a single object by class and id.
+
+        Args:
+            cls (class or str): The class of the object, or its name.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if it is not in storage.
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        if cls not in self.model_classes or id is None:
+            return None
+        return self.__objects.get(cls + '.' + id)
+
+    def count(self, cls=None):
+        """
+        Returns the number of objects in storage.
+
+        The class buckets are kept up to date by new() and delete(), so
+        this does not visit the objects.
+
+        Args:
+            cls (class or str, optional): The class to count, with its
+                subclasses, or the name of a class to count without its
+                subclasses. Defaults to None, all objects.
+
+        Returns:
+            int: The number of objects.
+        """
+        if cls is None:
+            return len(self.__objects)
+        if isinstance(cls, str):
+            cls = self.model_classes.get(cls)
+            return len(self.__buckets.get(cls, ())) if cls else 0
+        return sum(len(bucket) for bucket_cls, bucket in self.__buckets.items()
+                   if issubclass(bucket_cls, cls))
+
+    def iter(self, cls=None, batch_size=1000, after_key=None, load=None):
+        """
+        Iterates over the objects in storage in a stable order.
+
+        The objects are yielded by class name, then by id, which is the
+        order of their <class name>.<id> keys. The keys of a class bucket
+        are sorted when the iteration reaches it and read batch_size at a
+        time, so objects added or deleted meanwhile are seen if they fall
+        in a later batch.
+
+        Args:
+            cls (class or str, optional): The class to iterate over, with
+                its subclasses, or the name of a class to iterate over
+                without its subclasses. Defaults to None, all objects.
+            batch_size (int, optional): The number of keys looked up at a
+                time. Defaults to 1000.
+            after_key (str, optional): Resume after this <class name>.<id>
+                key, e.g. the key of the last object of a previous page.
+            load (list, optional): Accepted for compatibility with DBStorage.
+
+        Yields:
+            BaseModel: The objects.
+        """
+        exact = isinstance(cls, str)
+        if exact:
+            cls = self.model_classes.get(cls)
+            if cls is None:
+                return
+        after_cls = after_key.partition('.')[0] if after_key else ''
+        buckets = sorted(
+            (bucket_cls.__name__, bucket)
+            for bucket_cls, bucket in list(self.__buckets.items())
+            if cls is None or bucket_cls is cls or
+            (not exact and issubclass(bucket_cls, cls)))
+        for cls_name, bucket in buckets:
+            if cls_name < after_cls:
+                continue
+            keys = sorted(bucket)
+            start = 0
+            if cls_name == after_cls:
+                start = bisect.bisect_right(keys, after_key)
+            for i in range(start, len(keys), batch_size):
+                for key in keys[i:i + batch_size]:
+                    obj = self.__objects.get(key)
+                    if obj is not None:
+                        yield obj
 
     def delete(self, obj=None):
         """
@@ -55,9 +1214,10 @@ class FileStorage:
             obj (BaseModel, optional): The object to delete. Defaults to None.
         """
         if obj is not None:
-            obj_key = obj.to_dict()['__class__'] + '.' + obj.id
-            if obj_key in self.__objects.keys():
-                del self.__objects[obj_key]
+            obj_key = obj.__class__.__name__ + '.' + obj.id
+            with self.__lock:
+                if self.__drop(obj_key):
+                    self.__pending[obj_key] = None
 
     def new(self, obj):
         """
@@ -65,30 +1225,271 @@ class FileStorage:
 
         Args:
             obj (BaseModel): The object to add.
+
+        Raises:
+            ValueError: If a unique value of the object is held by
+                another object.
         """
-        obj_key = obj.to_dict()['__class__'] + '.' + obj.id
-        self.__objects[obj_key] = obj
+        obj_key = obj.__class__.__name__ + '.' + obj.id
+        with self.__lock:
+            self.__check_unique([(obj_key, obj)])
+            self.__put(obj_key, obj)
+            self.__pending[obj_key] = obj
+
+    def new_many(self, objs):
+        """
+        Adds several objects to the storage dictionary.
+
+        No object is added if one of them fails the unique checks.
+
+        Args:
+            objs (iterable): The objects to add.
+
+        Raises:
+            ValueError: If a unique value of an object is held by another
+                object.
+        """
+        items = [(obj.__class__.__name__ + '.' + obj.id, obj)
+                 for obj in objs]
+        with self.__lock:
+            self.__check_unique(items)
+            for obj_key, obj in items:
+                self.__put(obj_key, obj)
+                self.__pending[obj_key] = obj
+
+    def save_many(self, objs):
+        """
+        Saves several objects with a single write of the storage file.
+
+        This does what calling save() on each object does: updated_at
+        is set to the current time and the object is added to storage.
+
+        Args:
+            objs (iterable): The objects to save.
+        """
+        objs = list(objs)
+        now = datetime.now()
+        for obj in objs:
+            obj.updated_at = now
+        self.new_many(objs)
+        self.save()
 
     def save(self):
-        """Saves the storage dictionary to a file."""
-        with open(self.__file_path, 'w') as file:
-            temp = {}
-            for key, val in self.__objects.items():
-                temp[key] = val.to_dict()
-            json.dump(temp, file)
+        """
+        Saves the storage dictionary to a file.
+
+        Depending on the HBNB_FILE_SYNC policy the write is done now, or
+        deferred and grouped with the following saves.
+        """
+        if self.sync == 'always':
+            self.flush()
+            return
+        with self.__lock:
+            self.__unflushed += 1
+            if self.sync != 'interval':
+                return
+            if self.__unflushed >= self.sync_batch:
+                self.flush()
+            elif self.__timer is None:
+                self.__timer = threading.Timer(
+                    self.sync_ms / 1000, self.__flush_unflushed)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def flush(self):
+        """
+        Writes the storage dictionary to a file.
+
+        The file is written one object at a time to a temporary file that
+        then replaces the storage file, only dirty objects are encoded
+        again. In journal mode only the objects passed to new() or
+        delete() or dirty since the last write are appended to the journal.
+        The text index is written too when it changed.
+        """
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            self.__unflushed = 0
+            if self.__text is not None and self.__text.changed:
+                self.__text.dump(self.search_path)
+            if self.mode == 'sharded':
+                self.__flush_shards()
+                return
+            if self.mode == 'journal':
+                changes = self.__changes()
+                self.journal.append(
+                    (key, None if obj is None else obj.to_dict())
+                    for key, obj in changes.items()
+                )
+                for obj in changes.values():
+                    if obj is not None:
+                        obj.mark_clean()
+                if self.journal.needs_compaction():
+                    self.journal.compact_in_background(self.__file_path)
+                return
+            self.__refresh_dirty()
+            self.__pending = {}
+            tmp_path = self.__file_path + '.tmp'
+            with open(tmp_path, 'w') as file:
+                # dict.items reads the raw values of LazyObjects as they are
+                dump_encoded(self.__encoded(dict.items(self.__objects)), file)
+            os.replace(tmp_path, self.__file_path)
+
+    def shard_of(self, key):
+        """
+        Returns the name of the shard an object is stored in.
+
+        Args:
+            key (str): The <class name>.<id> key of the object.
+
+        Returns:
+            str: The class name, or the hash bucket name.
+        """
+        if self.shard_by == 'hash':
+            bucket = zlib.crc32(key.encode()) % self.shard_count
+            return 'shard-{:03d}'.format(bucket)
+        return key.partition('.')[0]
+
+    def __shard_path(self, name):
+        """
+        Returns the path to the file of a shard.
+
+        Args:
+            name (str): The name of the shard.
+
+        Returns:
+            str: The path to the shard file.
+        """
+        return os.path.join(self.shard_dir, name + '.json')
+
+    def __read_shard(self, name):
+        """
+        Reads the entries of a shard file.
+
+        Args:
+            name (str): The name of the shard.
+
+        Returns:
+            list: The (key, dict) entries of the shard.
+        """
+        with open(self.__shard_path(name), 'r') as file:
+            return list(iter_items(file))
+
+    def __load_shards(self, names, keep=False):
+        """
+        Reads shard files in parallel and stores their objects.
+
+        Args:
+            names (list): The names of the shards to read.
+            keep (bool, optional): Keep the objects already in memory
+                instead of replacing them. Defaults to False.
+        """
+        names = [name for name in names
+                 if os.path.isfile(self.__shard_path(name))]
+        with ThreadPoolExecutor() as executor:
+            for name, items in zip(names,
+                                   executor.map(self.__read_shard, names)):
+                for key, val in items:
+                    if not keep or key not in self.__objects:
+                        self.__load(key, val)
+        self.__loaded_shards.update(names)
+
+    def __reload_shards(self):
+        """
+        Loads the storage dictionary from the shard directory.
+
+        Without a shard directory the storage file is loaded instead and
+        written as shards on the next save.
+        """
+        if not os.path.isdir(self.shard_dir):
+            if os.path.isfile(self.__file_path):
+                with open(self.__file_path, 'r') as file:
+                    for key, val in iter_items(file):
+                        self.__load(key, val)
+                        self.__dirty_shards.add(self.shard_of(key))
+            return
+        names = [name[:-len('.json')] for name in os.listdir(self.shard_dir)
+                 if name.endswith('.json')]
+        if self.shard_by == 'class' and self.shards_to_load is not None:
+            names = [name for name in names if name in self.shards_to_load]
+        self.__load_shards(names)
+
+    def __flush_shards(self):
+        """Rewrites the shards holding objects changed since the last write."""
+        dirty, self.__dirty_shards = self.__dirty_shards, set()
+        for key in self.__changes():
+            dirty.add(self.shard_of(key))
+        os.makedirs(self.shard_dir, exist_ok=True)
+        unloaded = [name for name in dirty
+                    if name not in self.__loaded_shards]
+        self.__load_shards(unloaded, keep=True)
+        for name in dirty:
+            members = self.__shards.get(name)
+            path = self.__shard_path(name)
+            if not members:
+                if os.path.isfile(path):
+                    os.remove(path)
+                continue
+            with open(path + '.tmp', 'w') as file:
+                dump_encoded(self.__encoded(members.items()), file)
+            os.replace(path + '.tmp', path)
+        self.__loaded_shards.update(dirty)
+
+    def __flush_unflushed(self):
+        """Writes the storage dictionary if saves are waiting to be written."""
+        with self.__lock:
+            if self.__unflushed:
+                self.flush()
 
     def reload(self):
-        """Loads the storage dictionary from a file."""
-        classes = self.model_classes
+        """
+        Loads the storage dictionary from a file.
+
+        The file is parsed one object at a time, so only the object being
+        built is held in memory next to the objects already loaded. In
+        journal mode the journal is replayed on top of the file.
+        """
+        self.__text_synced = False
+        self.__grids = None
+        self.__sorted = None
+        self.__unique = None
+        self.__unique_values = {}
+        if self.mode == 'sharded':
+            self.__reload_shards()
+            return
         if os.path.isfile(self.__file_path):
-            temp = {}
-            with open(self.__file_path, 'r') as file:
-                temp = json.load(file)
-                for key, val in temp.items():
-                    obj_class = val['__class__']
-                    if obj_class in classes:
-                        self.__objects[key] = classes[obj_class](**val)
+            entries = None if self.cache is None else self.cache.read()
+            if entries is not None:
+                for key, val in entries:
+                    self.__load(key, val)
+            else:
+                with open(self.__file_path, 'r') as file:
+                    entries = iter_items(file)
+                    if self.cache is not None:
+                        entries = self.cache.build(entries)
+                    for key, val in entries:
+                        self.__load(key, val)
+        if self.mode == 'journal':
+            for key, val in self.journal.replay():
+                if val is None:
+                    self.__drop(key)
+                else:
+                    self.__load(key, val)
+
+    def checkpoint(self):
+        """
+        Folds the journal into the storage file.
+
+        Returns:
+            dict: The compaction report (see Journal.compact), or None
+                when not in journal mode or a compaction is running.
+        """
+        if self.mode != 'journal':
+            return None
+        return self.journal.compact(self.__file_path)
 
     def close(self):
-        """Closes the storage engine."""
+        """Closes the storage engine, writing the deferred saves first."""
+        self.__flush_unflushed()
         self.reload()
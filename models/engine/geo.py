@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+"""
+This module defines the geographic helpers used for the Place searches.
+
+Distances are great-circle distances on a sphere of the mean Earth
+radius. Longitude ranges whose minimum is greater than their maximum
+cross the 180th meridian.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+"""The mean radius of the Earth in kilometers."""
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """
+    Returns the great-circle distance between two points.
+
+    Args:
+        lat1 (float): The latitude of the first point, in degrees.
+        lon1 (float): The longitude of the first point, in degrees.
+        lat2 (float): The latitude of the second point, in degrees.
+        lon2 (float): The longitude of the second point, in degrees.
+
+    Returns:
+        float: The distance in kilometers.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + \
+        math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Returns the smallest latitude/longitude box around a circle.
+
+    Args:
+        lat (float): The latitude of the center, in degrees.
+        lon (float): The longitude of the center, in degrees.
+        radius_km (float): The radius of the circle in kilometers.
+
+    Returns:
+        tuple: The (min_lat, min_lon, max_lat, max_lon) of the box.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    min_lat = lat - dlat
+    max_lat = lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    ratio = math.sin(angle) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return min_lat, -180.0, max_lat, 180.0
+    dlon = math.degrees(math.asin(ratio))
+    min_lon = lon - dlon
+    max_lon = lon + dlon
+    if min_lon < -180:
+        min_lon += 360
+    if max_lon > 180:
+        max_lon -= 360
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def lon_ranges(min_lon, max_lon):
+    """
+    Splits a longitude range crossing the 180th meridian in two.
+
+    Args:
+        min_lon (float): The western longitude of the range.
+        max_lon (float): The eastern longitude of the range.
+
+    Returns:
+        list: The (min_lon, max_lon) ranges, each with min_lon <= max_lon.
+    """
+    if min_lon <= max_lon:
+        return [(min_lon, max_lon)]
+    return [(min_lon, 180.0), (-180.0, max_lon)]
+
+
+def in_box(lat, lon, min_lat, min_lon, max_lat, max_lon):
+    """
+    Tells if a point is inside a latitude/longitude box.
+
+    Args:
+        lat (float): The latitude of the point.
+        lon (float): The longitude of the point.
+        min_lat (float): The southern latitude of the box.
+        min_lon (float): The western longitude of the box.
+        max_lat (float): The northern latitude of the box.
+        max_lon (float): The eastern longitude of the box.
+
+    Returns:
+        bool: True if the point is inside the box or on its border.
+    """
+    if not min_lat <= lat <= max_lat:
+        return False
+    return any(low <= lon <= high
+               for low, high in lon_ranges(min_lon, max_lon))
+
+
+class GridIndex:
+    """
+    This class indexes points in a grid of cells of equal size in degrees.
+
+    A box search only visits the cells overlapping the box, or the
+    occupied cells when they are fewer.
+
+    Attributes:
+        cell_deg (float): The size of a cell in degrees.
+    """
+
+    def __init__(self, cell_deg=0.1):
+        """
+        Initializes a GridIndex instance.
+
+        Args:
+            cell_deg (float, optional): The size of a cell in degrees.
+                Defaults to 0.1, about 11 km of latitude.
+        """
+        self.cell_deg = cell_deg
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        """Returns the number of indexed points."""
+        return len(self.__points)
+
+    def __cell(self, lat, lon):
+        """Returns the (row, column) of the cell holding a point."""
+        return (math.floor(lat / self.cell_deg),
+                math.floor(lon / self.cell_deg))
+
+    def add(self, key, lat, lon):
+        """
+        Indexes a point, replacing the previous point of the key.
+
+        Args:
+            key (str): The key of the point.
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+        """
+        self.remove(key)
+        cell = self.__cell(lat, lon)
+        self.__points[key] = (lat, lon, cell)
+        self.__cells.setdefault(cell, {})[key] = (lat, lon)
+
+    def remove(self, key):
+        """
+        Removes the point of a key from the index.
+
+        Args:
+            key (str): The key of the point.
+        """
+        point = self.__points.pop(key, None)
+        if point is None:
+            return
+        cell = self.__cells[point[2]]
+        del cell[key]
+        if not cell:
+            del self.__cells[point[2]]
+
+    def in_box(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        Finds the points inside a latitude/longitude box.
+
+        Args:
+            min_lat (float): The southern latitude of the box.
+            min_lon (float): The western longitude of the box.
+            max_lat (float): The northern latitude of the box.
+            max_lon (float): The eastern longitude of the box.
+
+        Yields:
+            tuple: The (key, lat, lon) of the points inside the box.
+        """
+        for low, high in lon_ranges(min_lon, max_lon):
+            row_min, col_min = self.__cell(min_lat, low)
+            row_max, col_max = self.__cell(max_lat, high)
+            span = (row_max - row_min + 1) * (col_max - col_min + 1)
+            if span > len(self.__cells):
+                cells = [cell for (row, col), cell in
+                         list(self.__cells.items())
+                         if row_min <= row <= row_max and
+                         col_min <= col <= col_max]
+            else:
+                cells = [self.__cells.get((row, col))
+                         for row in range(row_min, row_max + 1)
+                         for col in range(col_min, col_max + 1)]
+            for cell in cells:
+                if not cell:
+                    continue
+                for key, (lat, lon) in list(cell.items()):
+                    if min_lat <= lat <= max_lat and low <= lon <= high:
+                        yield key, lat, lon
@@ -0,0 +1,238 @@
+#!/usr/bin/python3
+"""
+This module defines the append-only journal used by FileStorage.
+
+In journal mode every change to the storage is appended to a log file
+as one JSON record per line instead of rewriting the whole snapshot.
+The storage state is the snapshot with the journal replayed on top,
+and compact() periodically folds the journal back into the snapshot.
+"""
+import json
+import os
+import threading
+import time
+
+from models.engine.json_stream import dump_items, iter_items
+
+
+class Journal:
+    """
+    This class manages an append-only log of storage changes.
+
+    Each line of the log is a JSON object of the form
+    {"op": "put", "key": <key>, "obj": <dict>} or
+    {"op": "del", "key": <key>}.
+
+    Attributes:
+        path (str): The path to the log file.
+        max_bytes (int): The log size that triggers a compaction.
+        max_records (int): The record count that triggers a compaction.
+        records (int): The number of records in the log.
+        last_compaction (dict): The report of the last compaction.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes a Journal instance.
+
+        The compaction thresholds are read from the HBNB_JOURNAL_MAX_BYTES
+        and HBNB_JOURNAL_MAX_RECORDS environment variables.
+
+        Args:
+            path (str): The path to the log file.
+        """
+        self.path = path
+        self.max_bytes = int(os.getenv('HBNB_JOURNAL_MAX_BYTES', 64 << 20))
+        self.max_records = int(os.getenv('HBNB_JOURNAL_MAX_RECORDS', 100000))
+        self.records = 0
+        self.last_compaction = None
+        self.__lock = threading.Lock()
+        self.__compacting = threading.Lock()
+
+    @property
+    def rotated_path(self):
+        """The path the log is moved to while it is being compacted."""
+        return self.path + '.compacting'
+
+    def append(self, changes):
+        """
+        Appends records to the end of the log.
+
+        Args:
+            changes (iterable): (key, dict) pairs, a None dict records
+                that the object was deleted.
+
+        Returns:
+            int: The number of records written.
+        """
+        lines = []
+        for key, obj_dict in changes:
+            if obj_dict is None:
+                record = {'op': 'del', 'key': key}
+            else:
+                record = {'op': 'put', 'key': key, 'obj': obj_dict}
+            lines.append(json.dumps(record) + '\n')
+        if lines:
+            with self.__lock:
+                with open(self.path, 'a') as file:
+                    file.writelines(lines)
+                self.records += len(lines)
+        return len(lines)
+
+    def replay(self, path=None):
+        """
+        Reads the records of the log in the order they were written.
+
+        A log left behind by an interrupted compaction is read before
+        the live log. A torn last line, left behind by a crash in the
+        middle of an append, is ignored.
+
+        Args:
+            path (str, optional): A single log to read. Defaults to the
+                interrupted compaction log followed by the live log.
+
+        Yields:
+            tuple: A (key, dict) pair, the dict is None for deletions.
+        """
+        if path is None:
+            yield from self.replay(self.rotated_path)
+            self.records = 0
+            for change in self.replay(self.path):
+                self.records += 1
+                yield change
+            return
+        if not os.path.isfile(path):
+            return
+        with open(path, 'r') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record['op'] == 'del':
+                    yield record['key'], None
+                else:
+                    yield record['key'], record['obj']
+
+    def size(self):
+        """
+        Returns the size of the log in bytes.
+
+        Returns:
+            int: The size of the log file, 0 if it does not exist.
+        """
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def needs_compaction(self):
+        """
+        Tells if the log has grown past one of the compaction thresholds.
+
+        Returns:
+            bool: True if the log should be folded into the snapshot.
+        """
+        return (self.records >= self.max_records or
+                self.size() >= self.max_bytes)
+
+    def compact(self, snapshot_path):
+        """
+        Folds the log into a new snapshot.
+
+        The live log is first moved aside so writers keep appending to
+        a fresh log while the snapshot is rebuilt. The snapshot is
+        streamed, only the changes read from the log are held in memory.
+        The new snapshot is written to a temporary file and swapped in
+        with os.replace, so readers see either the old or the new
+        snapshot, never a partial one. If this is interrupted, the moved
+        log is replayed on the next reload and folded by the next
+        compaction.
+
+        Args:
+            snapshot_path (str): The path to the snapshot file.
+
+        Returns:
+            dict: The compaction report with the sizes before and after,
+                the bytes reclaimed, the records folded and the seconds
+                spent, or None if a compaction is already running.
+        """
+        if not self.__compacting.acquire(blocking=False):
+            return None
+        try:
+            start = time.monotonic()
+            with self.__lock:
+                if not os.path.isfile(self.rotated_path) and \
+                        os.path.isfile(self.path):
+                    os.replace(self.path, self.rotated_path)
+                    self.records = 0
+            bytes_before = 0
+            changes = {}
+            folded = 0
+            if os.path.isfile(self.rotated_path):
+                bytes_before += os.path.getsize(self.rotated_path)
+                for key, obj_dict in self.replay(self.rotated_path):
+                    folded += 1
+                    changes[key] = obj_dict
+            tmp_path = snapshot_path + '.compact.tmp'
+            with open(tmp_path, 'w') as file:
+                if os.path.isfile(snapshot_path):
+                    bytes_before += os.path.getsize(snapshot_path)
+                    with open(snapshot_path, 'r') as snapshot:
+                        dump_items(self.__fold(iter_items(snapshot), changes),
+                                   file)
+                else:
+                    dump_items(self.__fold((), changes), file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, snapshot_path)
+            if os.path.isfile(self.rotated_path):
+                os.remove(self.rotated_path)
+            bytes_after = os.path.getsize(snapshot_path)
+            self.last_compaction = {
+                'bytes_before': bytes_before,
+                'bytes_after': bytes_after,
+                'bytes_reclaimed': bytes_before - bytes_after,
+                'records': folded,
+                'seconds': time.monotonic() - start
+            }
+            return self.last_compaction
+        finally:
+            self.__compacting.release()
+
+    @staticmethod
+    def __fold(items, changes):
+        """
+        Applies the changes read from the log to the snapshot entries.
+
+        Args:
+            items (iterable): The (key, dict) entries of the snapshot.
+            changes (dict): The last dict logged for each key, None for
+                deleted objects. It is emptied as the entries are read.
+
+        Yields:
+            tuple: The (key, dict) entries of the new snapshot.
+        """
+        for key, obj_dict in items:
+            if key in changes:
+                obj_dict = changes.pop(key)
+            if obj_dict is not None:
+                yield key, obj_dict
+        for key, obj_dict in changes.items():
+            if obj_dict is not None:
+                yield key, obj_dict
+
+    def compact_in_background(self, snapshot_path):
+        """
+        Starts a compaction in a daemon thread.
+
+        Args:
+            snapshot_path (str): The path to the snapshot file.
+
+        Returns:
+            threading.Thread: The thread running the compaction.
+        """
+        thread = threading.Thread(
+            target=self.compact, args=(snapshot_path,), daemon=True)
+        thread.start()
+        return thread
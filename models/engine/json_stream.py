@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+"""
+This module reads and writes the storage file one entry at a time.
+
+The storage file is a single JSON object mapping keys to object
+dictionaries. json.load and json.dump need the whole dictionary in
+memory; the functions here only hold one entry at a time.
+"""
+import json
+import re
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+_colon = re.compile(r'[ \t\n\r]*:')
+_separator = re.compile(r'[ \t\n\r]*([,}])')
+
+
+class _Reader:
+    """
+    This class buffers a text file for incremental JSON decoding.
+    """
+
+    def __init__(self, file, chunk_size):
+        """
+        Initializes a _Reader instance.
+
+        Args:
+            file (file): The text file to read.
+            chunk_size (int): The number of characters read at a time.
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Reads the next chunk of the file into the buffer.
+
+        Returns:
+            bool: False if the end of the file was reached.
+        """
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character.
+
+        Returns:
+            str: The next character, '' at the end of the file.
+        """
+        while True:
+            self.pos = _whitespace.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        """
+        Consumes the next character, which must be char.
+
+        Args:
+            char (str): The expected character.
+
+        Raises:
+            json.JSONDecodeError: If the next character is not char.
+        """
+        if self.peek() != char:
+            raise json.JSONDecodeError(
+                "Expecting '{}'".format(char), self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """
+        Decodes the next JSON value.
+
+        Returns:
+            object: The decoded value.
+
+        Raises:
+            json.JSONDecodeError: If the file does not hold a valid value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A value ending with the buffer may continue in the next chunk
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def item(self):
+        """
+        Decodes the next entry of the object and the separator after it.
+
+        Entries that lie entirely in the buffer are decoded without any
+        per-character work; the others go through value() and peek(),
+        which read more of the file as needed.
+
+        Returns:
+            tuple: The key, the value and the separator (',' or '}').
+
+        Raises:
+            json.JSONDecodeError: If the file does not hold a valid entry.
+        """
+        buf = self.buf
+        try:
+            key, end = _decoder.raw_decode(buf, self.pos)
+            colon = _colon.match(buf, end)
+            if isinstance(key, str) and colon:
+                end = _whitespace.match(buf, colon.end()).end()
+                value, end = _decoder.raw_decode(buf, end)
+                separator = _separator.match(buf, end)
+                if separator:
+                    self.pos = separator.end()
+                    return key, value, separator.group(1)
+        except json.JSONDecodeError:
+            pass
+        key = self.value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError(
+                'Expecting property name', self.buf, self.pos)
+        self.expect(':')
+        value = self.value()
+        separator = self.peek()
+        if separator not in (',', '}'):
+            raise json.JSONDecodeError(
+                "Expecting ',' delimiter", self.buf, self.pos)
+        self.pos += 1
+        return key, value, separator
+
+
+def iter_items(file, chunk_size=1 << 16):
+    """
+    Reads the entries of a JSON object file one at a time.
+
+    Args:
+        file (file): A text file holding a JSON object.
+        chunk_size (int, optional): The number of characters read at a
+            time. Defaults to 64 KiB.
+
+    Yields:
+        tuple: The (key, value) pairs of the object.
+
+    Raises:
+        json.JSONDecodeError: If the file does not hold a JSON object.
+    """
+    reader = _Reader(file, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        reader.peek()
+        key, value, separator = reader.item()
+        yield key, value
+        if separator == '}':
+            return
+
+
+def dump_items(items, file):
+    """
+    Writes (key, value) pairs as a JSON object, one entry at a time.
+
+    The output is the same as json.dump(dict(items), file).
+
+    Args:
+        items (iterable): The (key, value) pairs to write.
+        file (file): The text file to write to.
+    """
+    dump_encoded(((key, json.dumps(value)) for key, value in items), file)
+
+
+def dump_encoded(items, file):
+    """
+    Writes (key, JSON text) pairs as a JSON object, one entry at a time.
+
+    Args:
+        items (iterable): The (key, value) pairs to write, the values
+            being already encoded with json.dumps.
+        file (file): The text file to write to.
+    """
+    file.write('{')
+    separator = ''
+    for key, value in items:
+        file.write(separator + json.dumps(key) + ': ' + value)
+        separator = ', '
+    file.write('}')
@@ -0,0 +1,263 @@
+#!/usr/bin/python3
+"""
+This module defines the query builder shared by the storage engines.
+
+A query is built with storage.query(cls) and refined with filter(),
+order_by(), limit() and offset(), each returning a new query:
+
+    storage.query(Place).filter(city_id=city.id, price_by_night__lt=100)
+                        .order_by('price_by_night').limit(10).all()
+
+The storage engine runs it: DBStorage compiles it to SQL, FileStorage
+evaluates it against its indexes.
+"""
+import heapq
+import operator
+from collections import namedtuple
+
+OPERATORS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'lt': operator.lt,
+    'le': operator.le,
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'in': lambda value, values: value in values
+}
+"""The filter operators, by the suffix that selects them."""
+
+
+class Condition(namedtuple('Condition', ['attr', 'op', 'value'])):
+    """
+    A filter condition: the attribute attr compared to value with op.
+    """
+
+    def matches(self, obj):
+        """
+        Tells if an object satisfies the condition.
+
+        Objects missing the attribute, or holding None or a value that
+        cannot be compared with value, do not satisfy it.
+
+        Args:
+            obj (BaseModel): The object to test.
+
+        Returns:
+            bool: True if the object satisfies the condition.
+        """
+        value = getattr(obj, self.attr, None)
+        if value is None and self.op not in ('eq', 'ne', 'in'):
+            return False
+        try:
+            return OPERATORS[self.op](value, self.value)
+        except TypeError:
+            return False
+
+
+class Query:
+    """
+    This class describes a query on the objects of a class.
+
+    Attributes:
+        storage: The storage engine running the query.
+        cls (class): The class of the objects.
+        conditions (tuple): The Condition the objects must all satisfy.
+        ordering (tuple): The (attr, descending) sort keys.
+        limit_count (int): The maximum number of objects, or None.
+        offset_count (int): The number of objects skipped.
+    """
+
+    def __init__(self, storage, cls):
+        """
+        Initializes a Query instance.
+
+        Args:
+            storage: The storage engine running the query.
+            cls (class): The class of the objects.
+        """
+        self.storage = storage
+        self.cls = cls
+        self.conditions = ()
+        self.ordering = ()
+        self.limit_count = None
+        self.offset_count = 0
+
+    def __clone(self, **changes):
+        """
+        Returns a copy of the query with some attributes changed.
+
+        Args:
+            **changes: The attributes to change.
+
+        Returns:
+            Query: The new query.
+        """
+        query = Query(self.storage, self.cls)
+        query.__dict__.update(self.__dict__)
+        query.__dict__.update(changes)
+        return query
+
+    def filter(self, **conditions):
+        """
+        Restricts the query to the objects satisfying all the conditions.
+
+        Each keyword is an attribute name, optionally followed by two
+        underscores and an operator: eq (the default), ne, lt, le, gt,
+        ge or in.
+
+        Args:
+            **conditions: The conditions, e.g. price_by_night__lt=100.
+
+        Returns:
+            Query: The new query.
+
+        Raises:
+            ValueError: If an operator does not exist, or if the value
+                of an in condition is a string instead of a list.
+        """
+        added = []
+        for name, value in conditions.items():
+            attr, _, op = name.partition('__')
+            op = op or 'eq'
+            if op not in OPERATORS:
+                raise ValueError('Unknown operator: ' + op)
+            if op == 'in':
+                if isinstance(value, str):
+                    raise ValueError('Expected a list of values: ' + name)
+                value = tuple(dict.fromkeys(value))
+            added.append(Condition(attr, op, value))
+        return self.__clone(conditions=self.conditions + tuple(added))
+
+    def order_by(self, *attrs):
+        """
+        Sorts the objects by attributes, a leading '-' sorts descending.
+
+        Args:
+            *attrs: The attribute names, e.g. '-price_by_night'.
+
+        Returns:
+            Query: The new query.
+        """
+        ordering = tuple((attr.lstrip('-'), attr.startswith('-'))
+                         for attr in attrs)
+        return self.__clone(ordering=self.ordering + ordering)
+
+    def limit(self, count):
+        """
+        Returns at most count objects.
+
+        Args:
+            count (int): The maximum number of objects.
+
+        Returns:
+            Query: The new query.
+        """
+        return self.__clone(limit_count=count)
+
+    def offset(self, count):
+        """
+        Skips the first count objects.
+
+        Args:
+            count (int): The number of objects to skip.
+
+        Returns:
+            Query: The new query.
+        """
+        return self.__clone(offset_count=count)
+
+    def matches(self, obj):
+        """
+        Tells if an object satisfies all the conditions of the query.
+
+        Args:
+            obj (BaseModel): The object to test.
+
+        Returns:
+            bool: True if the object satisfies them.
+        """
+        return all(condition.matches(obj) for condition in self.conditions)
+
+    def sort(self, objs):
+        """
+        Sorts objects in the order of the query, None values last.
+
+        Args:
+            objs (iterable): The objects to sort.
+
+        Returns:
+            list: The sorted objects.
+        """
+        objs = list(objs)
+        for attr, descending in reversed(self.ordering):
+            present = [obj for obj in objs
+                       if getattr(obj, attr, None) is not None]
+            missing = [obj for obj in objs
+                       if getattr(obj, attr, None) is None]
+            present.sort(key=operator.attrgetter(attr), reverse=descending)
+            objs = present + missing
+        return objs
+
+    def top(self, objs, count):
+        """
+        Returns the first objects in the order of the query.
+
+        With a single sort key, only count objects are kept in a heap
+        instead of sorting all of them.
+
+        Args:
+            objs (iterable): The objects to sort.
+            count (int): The number of objects to return.
+
+        Returns:
+            list: The first count objects, sorted.
+        """
+        if len(self.ordering) != 1:
+            return self.sort(objs)[:count]
+        attr, descending = self.ordering[0]
+        missing = []
+
+        def present():
+            """Yields the objects having a value, sets the others aside."""
+            for obj in objs:
+                if getattr(obj, attr, None) is None:
+                    missing.append(obj)
+                else:
+                    yield obj
+
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        first = pick(count, present(), key=operator.attrgetter(attr))
+        return (first + missing)[:count]
+
+    def __iter__(self):
+        """Runs the query and iterates over the objects."""
+        return iter(self.storage.execute(self))
+
+    def all(self):
+        """
+        Runs the query.
+
+        Returns:
+            list: The objects.
+        """
+        return list(self)
+
+    def first(self):
+        """
+        Runs the query for its first object.
+
+        Returns:
+            BaseModel: The first object, or None if there is none.
+        """
+        for obj in self.storage.execute(self.limit(1)):
+            return obj
+        return None
+
+    def count(self):
+        """
+        Counts the objects of the query, ignoring limit and offset.
+
+        Returns:
+            int: The number of objects.
+        """
+        return self.storage.execute(self, count=True)
@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+"""
+This module defines the full-text index used for the text searches.
+
+Documents are split into lowercase word tokens, each token maps to a
+posting list of the documents holding it with the number of times it
+appears, and the matches of a query are ranked with Okapi BM25.
+"""
+import heapq
+import marshal
+import math
+import os
+import re
+import zlib
+from collections import Counter
+
+INDEX_VERSION = 1
+"""The version of the index file format, other versions are rebuilt."""
+
+TEXT_FIELDS = {
+    'Place': ('name', 'description'),
+    'Review': ('text',)
+}
+"""The attributes indexed for the text searches, by class name."""
+
+_token = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """
+    Splits a text into lowercase word tokens.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list: The tokens, in order.
+    """
+    return _token.findall(text.lower())
+
+
+def document_text(obj, fields):
+    """
+    Joins the indexed attributes of an object into one text.
+
+    Args:
+        obj (BaseModel or dict): The object, or its raw dictionary.
+        fields (tuple): The names of the indexed attributes.
+
+    Returns:
+        str: The non-empty attribute values, one per line.
+    """
+    if type(obj) is dict:
+        values = (obj.get(field) for field in fields)
+    else:
+        values = (getattr(obj, field, None) for field in fields)
+    return '\n'.join(str(value) for value in values if value)
+
+
+class TextIndex:
+    """
+    This class is an inverted index of documents ranked with BM25.
+
+    Each document is identified by a key and remembers the checksum of
+    its text, which sync() uses to find the documents that changed since
+    the index was saved.
+
+    Attributes:
+        k1 (float): The BM25 term frequency saturation.
+        b (float): The BM25 document length normalization.
+        changed (bool): True if the index changed since it was saved
+            or loaded.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        """
+        Initializes a TextIndex instance.
+
+        Args:
+            k1 (float, optional): The term frequency saturation.
+                Defaults to 1.2.
+            b (float, optional): The document length normalization.
+                Defaults to 0.75.
+        """
+        self.k1 = k1
+        self.b = b
+        self.changed = False
+        self.__postings = {}
+        self.__docs = {}
+        self.__total_length = 0
+
+    def __len__(self):
+        """Returns the number of indexed documents."""
+        return len(self.__docs)
+
+    def __contains__(self, key):
+        """Tells if a document is indexed."""
+        return key in self.__docs
+
+    def add(self, key, text):
+        """
+        Indexes a document, replacing the previous text of the key.
+
+        Args:
+            key (str): The key of the document.
+            text (str): The text of the document.
+        """
+        checksum = zlib.crc32(text.encode())
+        doc = self.__docs.get(key)
+        if doc is not None and doc[0] == checksum:
+            return
+        self.remove(key)
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        for term, frequency in counts.items():
+            self.__postings.setdefault(term, {})[key] = frequency
+        self.__docs[key] = (checksum, length, tuple(counts))
+        self.__total_length += length
+        self.changed = True
+
+    def remove(self, key):
+        """
+        Removes a document from the index.
+
+        Args:
+            key (str): The key of the document.
+        """
+        doc = self.__docs.pop(key, None)
+        if doc is None:
+            return
+        for term in doc[2]:
+            postings = self.__postings[term]
+            del postings[key]
+            if not postings:
+                del self.__postings[term]
+        self.__total_length -= doc[1]
+        self.changed = True
+
+    def sync(self, docs):
+        """
+        Brings the index up to date with a complete set of documents.
+
+        Only the documents whose checksum differs are indexed again, and
+        the indexed documents missing from docs are removed.
+
+        Args:
+            docs (iterable): The (key, text) pairs of all the documents.
+
+        Returns:
+            int: The number of documents added, changed or removed.
+        """
+        seen = set()
+        updates = 0
+        for key, text in docs:
+            seen.add(key)
+            doc = self.__docs.get(key)
+            if doc is None or doc[0] != zlib.crc32(text.encode()):
+                self.add(key, text)
+                updates += 1
+        for key in [key for key in self.__docs if key not in seen]:
+            self.remove(key)
+            updates += 1
+        return updates
+
+    def search(self, query, limit=10, prefix=''):
+        """
+        Ranks the documents matching any token of a query.
+
+        Args:
+            query (str): The text to search for.
+            limit (int, optional): The maximum number of results.
+                Defaults to 10, None for no limit.
+            prefix (str, optional): Only rank the documents whose key
+                starts with it. Defaults to '', all documents.
+
+        Returns:
+            list: The (key, score) pairs, best score first.
+        """
+        count = len(self.__docs)
+        if not count:
+            return []
+        average = self.__total_length / count or 1
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.__postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) /
+                           (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                if not key.startswith(prefix):
+                    continue
+                norm = self.k1 * (1 - self.b +
+                                  self.b * self.__docs[key][1] / average)
+                scores[key] = scores.get(key, 0.0) + \
+                    idf * frequency * (self.k1 + 1) / (frequency + norm)
+        ranked = ((score, key) for key, score in scores.items())
+        if limit is None:
+            ranked = sorted(ranked, key=lambda item: (-item[0], item[1]))
+        else:
+            ranked = heapq.nsmallest(limit, ranked,
+                                     key=lambda item: (-item[0], item[1]))
+        return [(key, score) for score, key in ranked]
+
+    def dump(self, path):
+        """
+        Writes the index to a file.
+
+        The file is written to a temporary file that then replaces it.
+
+        Args:
+            path (str): The path to the index file.
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(marshal.dumps((INDEX_VERSION, self.__docs,
+                                      self.__postings, self.__total_length)))
+        os.replace(tmp_path, path)
+        self.changed = False
+
+    @classmethod
+    def load(cls, path, k1=1.2, b=0.75):
+        """
+        Reads an index written by dump().
+
+        Args:
+            path (str): The path to the index file.
+            k1 (float, optional): The term frequency saturation.
+                Defaults to 1.2.
+            b (float, optional): The document length normalization.
+                Defaults to 0.75.
+
+        Returns:
+            TextIndex: The index, or None if the file is missing, broken
+                or of another version.
+        """
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            version, docs, postings, total_length = marshal.loads(data)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != INDEX_VERSION:
+            return None
+        index = cls(k1, b)
+        index.__docs = docs
+        index.__postings = postings
+        index.__total_length = total_length
+        return index
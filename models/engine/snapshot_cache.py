@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+"""
+This module defines the binary cache of the storage file.
+
+Parsing file.json is the largest part of the start up time of a
+process using FileStorage. The cache stores the same entries with the
+marshal module, which loads them much faster, and is only used while
+the modification time, size and content hash of file.json match the
+ones it was built from.
+"""
+import hashlib
+import marshal
+import os
+import struct
+
+CACHE_VERSION = 2
+"""The version of the cache format, caches of other versions are rebuilt."""
+
+_length = struct.Struct('<Q')
+
+
+class SnapshotCache:
+    """
+    This class manages the marshal cache of a JSON storage file.
+
+    The cache file holds a header (version, mtime, size, hash) followed
+    by the (key, dict) entries of the storage file in chunks, ending with
+    None. Each of them is marshalled and prefixed with its length, so a
+    chunk is read with a single read() call.
+
+    Attributes:
+        path (str): The path to the cache file.
+        source_path (str): The path to the JSON storage file.
+        chunk_size (int): The number of entries per marshal chunk.
+    """
+
+    def __init__(self, path, source_path, chunk_size=1000):
+        """
+        Initializes a SnapshotCache instance.
+
+        Args:
+            path (str): The path to the cache file.
+            source_path (str): The path to the JSON storage file.
+            chunk_size (int, optional): The number of entries per marshal
+                chunk. Defaults to 1000.
+        """
+        self.path = path
+        self.source_path = source_path
+        self.chunk_size = chunk_size
+
+    def __stat(self):
+        """
+        Returns the modification time and size of the storage file.
+
+        Returns:
+            tuple: The (mtime in ns, size) of the storage file.
+        """
+        stat = os.stat(self.source_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def __digest(self):
+        """
+        Hashes the content of the storage file.
+
+        Returns:
+            str: The hex digest of the storage file.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(self.source_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def read(self):
+        """
+        Reads the cached entries if the cache matches the storage file.
+
+        The modification time and size are compared first, the content
+        hash is only computed when they match.
+
+        Returns:
+            generator: The (key, dict) entries of the storage file, or
+                None if there is no valid cache.
+        """
+        try:
+            file = open(self.path, 'rb')
+        except OSError:
+            return None
+        try:
+            version, mtime, size, digest = self.__load(file)
+            if version != CACHE_VERSION or \
+                    (mtime, size) != self.__stat() or \
+                    digest != self.__digest():
+                file.close()
+                return None
+        except (EOFError, ValueError, TypeError, OSError):
+            file.close()
+            return None
+        return self.__entries(file)
+
+    @staticmethod
+    def __dump(value, file):
+        """
+        Writes a value prefixed with its length.
+
+        Args:
+            value: The value to marshal.
+            file (file): The binary file to write to.
+        """
+        data = marshal.dumps(value)
+        file.write(_length.pack(len(data)) + data)
+
+    @staticmethod
+    def __load(file):
+        """
+        Reads a value written by __dump.
+
+        Args:
+            file (file): The binary file to read from.
+
+        Returns:
+            The value.
+
+        Raises:
+            EOFError: If the file ends before the value.
+        """
+        prefix = file.read(_length.size)
+        if len(prefix) < _length.size:
+            raise EOFError('Truncated cache')
+        size, = _length.unpack(prefix)
+        data = file.read(size)
+        if len(data) < size:
+            raise EOFError('Truncated cache')
+        return marshal.loads(data)
+
+    def __entries(self, file):
+        """
+        Reads the entry chunks that follow the header.
+
+        Args:
+            file (file): The cache file, positioned after the header.
+
+        Yields:
+            tuple: The (key, dict) entries.
+        """
+        with file:
+            while True:
+                chunk = self.__load(file)
+                if chunk is None:
+                    return
+                yield from chunk
+
+    def build(self, entries):
+        """
+        Passes entries read from the storage file through, caching them.
+
+        The cache is written to a temporary file that only replaces the
+        cache once all the entries were read and the storage file did
+        not change in the meantime.
+
+        Args:
+            entries (iterable): The (key, dict) entries of the storage file.
+
+        Yields:
+            tuple: The same entries.
+        """
+        stat = self.__stat()
+        header = (CACHE_VERSION,) + stat + (self.__digest(),)
+        tmp_path = self.path + '.tmp'
+        complete = False
+        try:
+            with open(tmp_path, 'wb') as file:
+                self.__dump(header, file)
+                chunk = []
+                for entry in entries:
+                    chunk.append(entry)
+                    if len(chunk) >= self.chunk_size:
+                        self.__dump(chunk, file)
+                        chunk = []
+                    yield entry
+                if chunk:
+                    self.__dump(chunk, file)
+                self.__dump(None, file)
+            complete = self.__stat() == stat
+        finally:
+            if complete:
+                os.replace(tmp_path, self.path)
+            elif os.path.isfile(tmp_path):
+                os.remove(tmp_path)
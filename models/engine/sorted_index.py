@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+"""
+This module defines the ordered index used for the range queries.
+"""
+import bisect
+
+
+class SortedIndex:
+    """
+    This class keeps keys ordered by a value, for range lookups.
+
+    The (value, key) pairs are held in two parallel lists sorted by
+    value then key, searched with bisect. The lists are only built on
+    the first lookup, by sorting all the pairs once; after that add()
+    and remove() keep them sorted. Keys whose value is None are kept
+    apart and returned by missing().
+    """
+
+    def __init__(self):
+        """Initializes a SortedIndex instance."""
+        self.__by_key = {}
+        self.__missing = {}
+        self.__values = None
+        self.__keys = None
+
+    def __len__(self):
+        """Returns the number of keys having a value."""
+        return len(self.__by_key)
+
+    def __build(self):
+        """Sorts the pairs into the parallel lists if they are not built."""
+        if self.__values is None:
+            pairs = sorted((value, key) for key, value in
+                           self.__by_key.items())
+            self.__values = [value for value, _ in pairs]
+            self.__keys = [key for _, key in pairs]
+
+    def __position(self, key, value):
+        """
+        Returns the position of a pair in the lists.
+
+        Args:
+            key (str): The key.
+            value: The value of the key.
+
+        Returns:
+            int: The position where the pair is, or would be inserted.
+        """
+        low = bisect.bisect_left(self.__values, value)
+        high = bisect.bisect_right(self.__values, value, low)
+        return bisect.bisect_left(self.__keys, key, low, high)
+
+    def add(self, key, value):
+        """
+        Indexes a key, replacing its previous value.
+
+        Args:
+            key (str): The key.
+            value: The value, or None if the key has none.
+        """
+        if value is None:
+            self.remove(key)
+            self.__missing[key] = None
+            return
+        old = self.__by_key.get(key)
+        if old is not None and old == value and type(old) is type(value):
+            return
+        self.remove(key)
+        self.__by_key[key] = value
+        if self.__values is not None:
+            i = self.__position(key, value)
+            self.__values.insert(i, value)
+            self.__keys.insert(i, key)
+
+    def remove(self, key):
+        """
+        Removes a key from the index.
+
+        Args:
+            key (str): The key.
+        """
+        self.__missing.pop(key, None)
+        value = self.__by_key.pop(key, None)
+        if value is None or self.__values is None:
+            return
+        i = self.__position(key, value)
+        del self.__values[i]
+        del self.__keys[i]
+
+    def span(self, low=None, high=None, low_inclusive=True,
+             high_inclusive=True):
+        """
+        Returns the positions of the keys whose value is in a range.
+
+        Args:
+            low (optional): The lowest value, None for no lower bound.
+            high (optional): The highest value, None for no upper bound.
+            low_inclusive (bool, optional): Include the keys valued low.
+                Defaults to True.
+            high_inclusive (bool, optional): Include the keys valued high.
+                Defaults to True.
+
+        Returns:
+            tuple: The (start, stop) positions, stop - start keys.
+        """
+        self.__build()
+        start, stop = 0, len(self.__values)
+        if low is not None:
+            find = bisect.bisect_left if low_inclusive else bisect.bisect_right
+            start = find(self.__values, low)
+        if high is not None:
+            find = bisect.bisect_right if high_inclusive else \
+                bisect.bisect_left
+            stop = max(start, find(self.__values, high))
+        return start, stop
+
+    def keys(self, start, stop, reverse=False):
+        """
+        Returns the keys between two positions returned by span().
+
+        Args:
+            start (int): The position of the first key.
+            stop (int): The position after the last key.
+            reverse (bool, optional): Return them by decreasing value.
+                Defaults to False.
+
+        Returns:
+            list: The keys, ordered by value then key.
+        """
+        self.__build()
+        keys = self.__keys[start:stop]
+        if reverse:
+            keys.reverse()
+        return keys
+
+    def missing(self):
+        """
+        Returns the keys having no value.
+
+        Returns:
+            list: The keys.
+        """
+        return list(self.__missing)
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""
+This module defines a class to manage SQLite storage for the hbnb clone.
+"""
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from models.engine.db_storage import DBStorage
+
+
+class SQLiteStorage(DBStorage):
+    """
+    This class manages the storage of hbnb models in a SQLite database.
+
+    It stores the same SQLAlchemy models as DBStorage in the file named
+    by the HBNB_SQLITE_PATH environment variable (hbnb.db by default,
+    ':memory:' for an in-memory database shared by all the threads).
+    Every connection is set up with the pragmas below: write-ahead
+    logging so readers do not block the writer, enforced foreign keys,
+    and larger page and memory-mapped caches.
+    """
+
+    # PRAGMA statements run on every new connection
+    pragmas = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'foreign_keys': 'ON',
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+        'cache_size': -65536,
+        'mmap_size': 268435456
+    }
+
+    def database_url(self):
+        """
+        Builds the URL of the database from HBNB_SQLITE_PATH.
+
+        Returns:
+            str: The SQLAlchemy database URL.
+        """
+        path = os.getenv('HBNB_SQLITE_PATH', 'hbnb.db')
+        if path == ':memory:':
+            return 'sqlite://'
+        return 'sqlite:///' + path
+
+    def make_engine(self):
+        """
+        Creates the SQLAlchemy engine of the storage.
+
+        An in-memory database lives as long as its connection, so it uses
+        a single connection shared by the threads instead of a pool.
+
+        Returns:
+            Engine: The engine connected to database_url().
+        """
+        url = self.database_url()
+        if url == 'sqlite://':
+            engine = create_engine(
+                url,
+                poolclass=StaticPool,
+                connect_args={'check_same_thread': False}
+            )
+        else:
+            engine = super().make_engine()
+        event.listen(engine, 'connect', self.__set_pragmas)
+        return engine
+
+    def __set_pragmas(self, dbapi_connection, connection_record):
+        """
+        Runs the pragmas on a new connection.
+
+        Args:
+            dbapi_connection: The sqlite3 connection.
+            connection_record: The pool record of the connection.
+        """
+        cursor = dbapi_connection.cursor()
+        for name, value in self.pragmas.items():
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
+        cursor.close()
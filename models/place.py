@@ -4,7 +4,7 @@ Place Module for the HBNB project.
 """
 import os
 from tests.test_models.test_base_model import TestBaseModel
-from sqlalchemy import Column, Float, ForeignKey, Integer, String, Table
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, String, Table
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
 from models.review import Review
@@ -26,7 +26,8 @@ place_amenity = Table(
         String(60),
         ForeignKey('amenities.id'),
         nullable=False,
-        primary_key=True
+        primary_key=True,
+        index=True
     )
 )
 """
@@ -56,20 +57,29 @@ class Place(BaseModel, Base):
         amenities (property): The amenities of the place.
     """
     __tablename__ = 'places'
-    city_id = Column(String(60), ForeignKey('cities.id'), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    user_id = Column(String(60), ForeignKey('users.id'), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    name = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    description = Column(String(1024), nullable=True) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    number_rooms = Column(Integer, nullable=False, default=0) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else 0
-    number_bathrooms = Column(Integer, nullable=False, default=0) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else 0
-    max_guest = Column(Integer, nullable=False, default=0) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else 0
-    price_by_night = Column(Integer, nullable=False, default=0) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else 0
-    latitude = Column(Float, nullable=True) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else 0.0
-    longitude = Column(Float, nullable=True) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else 0.0
+    city_id = Column(String(60), ForeignKey('cities.id'), nullable=False, index=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    user_id = Column(String(60), ForeignKey('users.id'), nullable=False, index=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    name = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    description = Column(String(1024), nullable=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    number_rooms = Column(Integer, nullable=False, default=0) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else 0
+    number_bathrooms = Column(Integer, nullable=False, default=0) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else 0
+    max_guest = Column(Integer, nullable=False, default=0) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else 0
+    price_by_night = Column(Integer, nullable=False, default=0) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else 0
+    latitude = Column(Float, nullable=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else 0.0
+    longitude = Column(Float, nullable=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else 0.0
+    if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'):
+        __table_args__ = (
+            Index('ix_places_latitude_longitude', 'latitude', 'longitude'),
+            Index('ix_places_price_by_night', 'price_by_night'),
+            Index('ix_places_max_guest', 'max_guest'),
+            Index('ix_places_number_rooms', 'number_rooms'),
+            Index('ix_places_city_id_price_by_night',
+                  'city_id', 'price_by_night'),
+        )
     amenity_ids = []
-    reviews = relationship('Review', cascade='all, delete, delete-orphan', backref='place') if os.getenv('HBNB_TYPE_STORAGE') == 'db' else None
+    reviews = relationship('Review', cascade='all, delete, delete-orphan', backref='place') if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else None
 
-    if os.getenv('HBNB_TYPE_STORAGE') == 'db':
+    if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'):
         amenities = relationship('Amenity', secondary=place_amenity, viewonly=False, backref='place_amenities')
     else:
         @property
@@ -77,8 +87,9 @@ class Place(BaseModel, Base):
             """Returns the amenities of this Place"""
             from models import storage
             amenities_of_place = []
-            for value in storage.all(Amenity).values():
-                if value.id in self.amenity_ids:
+            for amenity_id in self.amenity_ids:
+                value = storage.get(Amenity, amenity_id)
+                if value is not None:
                     amenities_of_place.append(value)
             return amenities_of_place
 
@@ -88,13 +99,10 @@ class Place(BaseModel, Base):
             if isinstance(value, Amenity):
                 if value.id not in self.amenity_ids:
                     self.amenity_ids.append(value.id)
+                    self.mark_dirty()
 
         @property
         def reviews(self):
             """Returns the reviews of this Place"""
             from models import storage
-            reviews_of_place = []
-            for value in storage.all(Review).values():
-                if value.place_id == self.id:
-                    reviews_of_place.append(value)
-            return reviews_of_place
+            return storage.related(Review, 'place_id', self.id)
@@ -27,6 +27,6 @@ class Review(BaseModel, Base):
     """
 
     __tablename__ = 'reviews'
-    place_id = Column(String(60), ForeignKey('places.id'), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    user_id = Column(String(60), ForeignKey('users.id'), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    text = Column(String(1024), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else''
+    place_id = Column(String(60), ForeignKey('places.id'), nullable=False, index=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    user_id = Column(String(60), ForeignKey('users.id'), nullable=False, index=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    text = Column(String(1024), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else''
@@ -20,17 +20,13 @@ class State(BaseModel, Base):
         cities (relationship): The cities associated with the state.
     """
     __tablename__ = 'states'
-    name = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
+    name = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
 
-    if os.getenv('HBNB_TYPE_STORAGE') == 'db':
+    if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'):
         cities = relationship('City', cascade='all, delete, delete-orphan', backref='state')
     else:
         @property
         def cities(self):
             """Returns the cities in this State"""
             from models import storage
-            cities_in_state = []
-            for value in storage.all(City).values():
-                if value.state_id == self.id:
-                    cities_in_state.append(value)
-            return cities_in_state
+            return storage.related(City, 'state_id', self.id)
@@ -7,6 +7,8 @@ from tests.test_models.test_base_model import TestBaseModel
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
+from models.place import Place
+from models.review import Review
 
 
 class User(BaseModel, Base):
@@ -15,7 +17,10 @@ class User(BaseModel, Base):
 
     Attributes:
         __tablename__ (str): The table name for the database storage.
-        email (str): The email address of the user.
+        email (str): The email address of the user, unique among users.
+            It is stored lowercase and without surrounding spaces, so
+            every engine compares Ada@x and ada@x as the same email,
+            as MySQL's default collation does.
         password (str): The password of the user.
         first_name (str): The first name of the user.
         last_name (str): The last name of the user.
@@ -23,9 +28,60 @@ class User(BaseModel, Base):
         reviews (relationship): A relationship to the Review class.
     """
     __tablename__ = 'users'
-    email = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    password = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    first_name = Column(String(128), nullable=True) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    last_name = Column(String(128), nullable=True) if os.getenv('HBNB_TYPE_STORAGE') == 'db' else ''
-    places = relationship('Place', cascade="all, delete, delete-orphan", backref='user') if os.getenv('HBNB_TYPE_STORAGE') == 'db' else None
-    reviews = relationship('Review', cascade="all, delete, delete-orphan", backref='user') if os.getenv('HBNB_TYPE_STORAGE') == 'db' else None
+    email = Column(String(128), nullable=False, unique=True, index=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    password = Column(String(128), nullable=False) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    first_name = Column(String(128), nullable=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+    last_name = Column(String(128), nullable=True) if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite') else ''
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializes a new instance of the User.
+
+        Args:
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments, the email is normalized.
+        """
+        if isinstance(kwargs.get('email'), str):
+            kwargs['email'] = User.normalize_email(kwargs['email'])
+        super().__init__(*args, **kwargs)
+
+    def __setattr__(self, name, value):
+        """
+        Sets an attribute, normalizing the email.
+
+        Args:
+            name (str): The name of the attribute.
+            value: The value of the attribute.
+        """
+        if name == 'email' and isinstance(value, str):
+            value = User.normalize_email(value)
+        super().__setattr__(name, value)
+
+    @staticmethod
+    def normalize_email(email):
+        """
+        Returns an email address in the form it is stored in.
+
+        Args:
+            email (str): The email address.
+
+        Returns:
+            str: The address, lowercase and without surrounding spaces.
+        """
+        return email.strip().lower()
+
+    if os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'):
+        places = relationship('Place', cascade="all, delete, delete-orphan", backref='user')
+        reviews = relationship('Review', cascade="all, delete, delete-orphan", backref='user')
+    else:
+        @property
+        def places(self):
+            """Returns the places of this User"""
+            from models import storage
+            return storage.related(Place, 'user_id', self.id)
+
+        @property
+        def reviews(self):
+            """Returns the reviews written by this User"""
+            from models import storage
+            return storage.related(Review, 'user_id', self.id)
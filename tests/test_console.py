@@ -1,6 +1,8 @@
+import json
 import os
 import sys
 import unittest
+import uuid
 from io import StringIO
 from unittest.mock import patch
 
@@ -13,7 +15,7 @@ from tests import clear_stream
 class TestHBNBCommand(unittest.TestCase):
     """Unit tests for the HBNBCommand class."""
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'FileStorage test')
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
     def test_fs_create(self):
         """Test the create command using FileStorage."""
         with patch('sys.stdout', new=StringIO()) as cout:
@@ -39,7 +41,127 @@ class TestHBNBCommand(unittest.TestCase):
             self.assertIn("'age': 17", cout.getvalue().strip())
             self.assertIn("'height': 5.9", cout.getvalue().strip())
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'DBStorage test')
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+    def test_fs_all(self):
+        """Test the paging options and formats of the all command."""
+        with patch('sys.stdout', new=StringIO()) as cout:
+            console = HBNBCommand()
+            ids = []
+            for name in ('A', 'B', 'C'):
+                console.onecmd('create Amenity name="{}"'.format(name))
+                ids.append(cout.getvalue().strip())
+                clear_stream(cout)
+            ids.sort()
+            expected = [str(storage.get('Amenity', i)) for i in ids]
+
+            console.onecmd('all Amenity --page-size 2')
+            self.assertEqual(cout.getvalue(), str(expected) + '\n')
+            clear_stream(cout)
+
+            console.onecmd('all Amenity --offset 1 --limit 1')
+            self.assertEqual(cout.getvalue(), str(expected[1:2]) + '\n')
+            clear_stream(cout)
+
+            console.onecmd('all Amenity --format jsonl')
+            lines = cout.getvalue().splitlines()
+            self.assertEqual([json.loads(line)['id'] for line in lines], ids)
+            clear_stream(cout)
+
+            console.onecmd('all Amenity --limit -1')
+            self.assertEqual(cout.getvalue().strip(), '** invalid value **')
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+    def test_fs_count(self):
+        """Test that the count command leaves out subclasses."""
+        with patch('sys.stdout', new=StringIO()) as cout:
+            console = HBNBCommand()
+            console.onecmd('create BaseModel')
+            console.onecmd('create User')
+            expected = sum(1 for key in storage.all()
+                           if key.startswith('BaseModel.'))
+            clear_stream(cout)
+
+            console.onecmd('count BaseModel')
+            self.assertEqual(cout.getvalue().strip(), str(expected))
+            clear_stream(cout)
+
+            console.onecmd(console.precmd('BaseModel.count()'))
+            self.assertEqual(cout.getvalue().strip(), str(expected))
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+    def test_fs_all_exact_class(self):
+        """Test that the all command leaves out subclasses."""
+        with patch('sys.stdout', new=StringIO()) as cout:
+            console = HBNBCommand()
+            console.onecmd('create BaseModel')
+            console.onecmd('create User')
+            clear_stream(cout)
+
+            console.onecmd('all BaseModel --format jsonl')
+            lines = cout.getvalue().splitlines()
+            self.assertTrue(lines)
+            self.assertEqual({json.loads(line)['__class__'] for line in lines},
+                             {'BaseModel'})
+
+    def test_search(self):
+        """Test the search command."""
+        with patch('sys.stdout', new=StringIO()) as cout:
+            console = HBNBCommand()
+            console.onecmd('search')
+            self.assertEqual(cout.getvalue().strip(),
+                             '** search text missing **')
+            clear_stream(cout)
+            console.onecmd('search User quiet')
+            self.assertEqual(cout.getvalue().strip(),
+                             '** class not searchable **')
+            clear_stream(cout)
+            console.onecmd('search quiet --limit x')
+            self.assertEqual(cout.getvalue().strip(), '** invalid value **')
+            clear_stream(cout)
+            console.onecmd('search Place zzyzx')
+            self.assertEqual(cout.getvalue().strip(), '[]')
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+    def test_fs_unique_email(self):
+        """Test that create and update reject an email already used."""
+        ada, bob = ('{}@hbnb.io'.format(uuid.uuid4()) for _ in range(2))
+        with patch('sys.stdout', new=StringIO()) as cout:
+            console = HBNBCommand()
+            console.onecmd('create User email="{}"'.format(ada))
+            clear_stream(cout)
+            console.onecmd('create User email="{}"'.format(ada))
+            self.assertEqual(cout.getvalue().strip(),
+                             '** User.email already exists: {} **'.format(ada))
+            clear_stream(cout)
+            console.onecmd('create User email="{}"'.format(bob))
+            bob_id = cout.getvalue().strip()
+            clear_stream(cout)
+            console.onecmd('update User {} email "{}"'.format(bob_id, ada))
+            self.assertIn('already exists', cout.getvalue())
+            self.assertEqual(storage.get('User', bob_id).email, bob)
+            self.assertEqual(storage.get_by('User', email=bob).id, bob_id)
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+    def test_fs_search(self):
+        """Test that the search command ranks the places."""
+        word, other = ('w' + uuid.uuid4().hex for _ in range(2))
+        with patch('sys.stdout', new=StringIO()) as cout:
+            console = HBNBCommand()
+            console.onecmd('create Place name="{}_{}"'.format(word, other))
+            first = cout.getvalue().strip()
+            clear_stream(cout)
+            console.onecmd('create Place name="{0}_by_the_{0}"'.format(word))
+            second = cout.getvalue().strip()
+            clear_stream(cout)
+            console.onecmd('search Place {} --limit 1'.format(word))
+            self.assertEqual(cout.getvalue().strip(),
+                             str([str(storage.get('Place', second))]))
+            clear_stream(cout)
+            console.onecmd(console.precmd('Place.search("{}")'.format(other)))
+            self.assertEqual(cout.getvalue().strip(),
+                             str([str(storage.get('Place', first))]))
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite'), 'DBStorage test')
     def test_db_create(self):
         """Test the create command using Database Storage."""
         with patch('sys.stdout', new=StringIO()) as cout:
@@ -57,20 +179,45 @@ class TestHBNBCommand(unittest.TestCase):
             self.assertIsNotNone(user)
             self.assertEqual(user.email, "john25@gmail.com")
             self.assertEqual(user.password, "123")
+            clear_stream(cout)
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'DBStorage test')
+            console.onecmd('create User email="john25@gmail.com" password="1"')
+            self.assertEqual(
+                cout.getvalue().strip(),
+                "** User.email already exists: john25@gmail.com **")
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite'), 'DBStorage test')
     def test_db_show(self):
         """Test the show command using Database Storage."""
         with patch('sys.stdout', new=StringIO()) as cout:
             console = HBNBCommand()
-            user = User(email="john25@gmail.com", password="123")
+            user = User(email="john26@gmail.com", password="123")
             user.save()
 
             console.onecmd('show User {}'.format(user.id))
-            self.assertIn('john25@gmail.com', cout.getvalue())
+            self.assertIn('john26@gmail.com', cout.getvalue())
             self.assertIn('123', cout.getvalue())
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'DBStorage test')
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite'), 'DBStorage test')
+    def test_db_update(self):
+        """Test that the update command writes to the database."""
+        with patch('sys.stdout', new=StringIO()) as cout:
+            console = HBNBCommand()
+            User(email="john28@gmail.com", password="123").save()
+            user = User(email="john27@gmail.com", password="123")
+            user.save()
+            user_id = user.id
+
+            console.onecmd('update User {} first_name "Betty"'.format(user_id))
+            console.onecmd('update User {} email "john28@gmail.com"'.format(
+                user_id))
+            self.assertIn('already exists', cout.getvalue())
+            storage.close()
+            user = storage.get(User, user_id)
+            self.assertEqual(user.first_name, "Betty")
+            self.assertEqual(user.email, "john27@gmail.com")
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite'), 'DBStorage test')
     def test_db_count(self):
         """Test the count command using Database Storage."""
         with patch('sys.stdout', new=StringIO()) as cout:
@@ -78,6 +225,7 @@ class TestHBNBCommand(unittest.TestCase):
             prev_count = console.count('State')
 
             console.onecmd('create State name="Enugu"')
+            clear_stream(cout)
             console.onecmd('count State')
             cnt = cout.getvalue().strip()
 
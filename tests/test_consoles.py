@@ -18,7 +18,7 @@ from tests import clear_stream
 class TestHBNBCommand(unittest.TestCase):
     """Unit tests for the HBNBCommand class."""
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'FileStorage test')
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
     def test_fs_create(self):
         """Test the create command using FileStorage.
 
@@ -29,5 +29,5 @@ class TestAmenity(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.name), expected_type)
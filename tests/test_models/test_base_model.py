@@ -88,7 +88,7 @@ class TestBaseModel(unittest.TestCase):
         with self.assertRaises(TypeError):
             new = BaseModel(**copy)
 
-    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'FileStorage test')
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
     def test_save(self):
         """
         Tests the save function of the BaseModel class.
@@ -29,7 +29,7 @@ class TestCity(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.state_id), expected_type)
 
     def test_name(self):
@@ -40,5 +40,5 @@ class TestCity(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.name), expected_type)
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Module for testing the LRU object cache.
+"""
+import unittest
+
+from models.engine.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    """
+    Class to test LRUCache.
+    """
+
+    def setUp(self):
+        """
+        Set up a cache of two entries with a fake clock.
+        """
+        self.now = 0
+        self.cache = LRUCache(2, ttl=10, clock=lambda: self.now)
+
+    def test_hits_misses(self):
+        """
+        Test that reads are counted as hits or misses.
+        """
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('b', 2), 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    def test_eviction(self):
+        """
+        Test that the least recently used entry is evicted.
+        """
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+        self.cache.put('c', 3)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_expiry(self):
+        """
+        Test that entries older than the ttl are dropped.
+        """
+        self.cache.put('a', 1)
+        self.now = 10
+        self.assertEqual(self.cache.get('a'), 1)
+        self.now = 11
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.expirations, 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidate(self):
+        """
+        Test dropping entries.
+        """
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.invalidate('a', 'c')
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get('b'), 2)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ Module for testing DBStorage.
 import os
 import unittest
 from datetime import datetime
+from unittest.mock import patch
 import MySQLdb
 
 from models import storage
@@ -164,6 +165,41 @@ class TestDBStorage(unittest.TestCase):
         self.assertEqual(old_cnt + 1, new_cnt)
         self.assertTrue(self.new_user in storage.all().values())
 
+    def test_all_load(self):
+        """
+        Test that the load option loads relationships with the objects.
+        """
+        objects = storage.all(User, load=['places', 'reviews:joined'])
+        user = objects['User.{}'.format(self.new_user.id)]
+        self.assertIn('places', user.__dict__)
+        self.assertIn('reviews', user.__dict__)
+        with self.assertRaises(ValueError):
+            storage.all(User, load=['nope'])
+        with self.assertRaises(ValueError):
+            storage.all(User, load=['places:nope'])
+
+    def test_all_stream(self):
+        """
+        Test that the streaming view reads the same objects as all().
+        """
+        objects = storage.all(User)
+        view = storage.all(User, stream=True)
+        self.assertEqual(len(view), len(objects))
+        self.assertEqual(set(view), set(objects))
+        self.assertEqual(dict(view.items()), objects)
+        key = 'User.{}'.format(self.new_user.id)
+        self.assertIs(view[key], self.new_user)
+        self.assertNotIn('User.nope', view)
+
+    def test_pool_options(self):
+        """
+        Test that the pool settings are read from the environment.
+        """
+        with patch.dict(os.environ, {'HBNB_DB_POOL_SIZE': '3',
+                                     'HBNB_DB_POOL_TIMEOUT': '2.5'}):
+            self.assertEqual(storage.pool_options(),
+                             {'pool_size': 3, 'pool_timeout': 2.5})
+
     def test_storage_var_created(self):
         """
         Test that DBStorage object storage is created.
@@ -2,16 +2,26 @@
 """
 Module for testing file storage.
 """
+import json
 import os
+import shutil
+import time
 import unittest
+from unittest.mock import patch
 
 from models import storage
 from models.base_model import BaseModel
-from models.engine.file_storage import FileStorage
+from models.user import User
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.engine.file_storage import FileStorage, LazyObjects
+from models.engine.json_stream import dump_encoded
 
 
 @unittest.skipIf(
-    os.getenv('HBNB_TYPE_STORAGE') == 'db', 'FileStorage test')
+    os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
 class TestFileStorage(unittest.TestCase):
     """
     Class to test the file storage method.
@@ -39,16 +49,18 @@ class TestFileStorage(unittest.TestCase):
         """
         # Clear the objects in storage
         storage._FileStorage__objects = {}
+        storage._FileStorage__reindex()
 
     def tearDown(self):
         """
         Clean up after each test.
         """
-        # Remove the storage file
-        try:
-            os.remove('file.json')
-        except FileNotFoundError:
-            pass
+        # Remove the storage file and its search index
+        for path in ('file.json', storage.search_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
 
     def test_obj_list_empty(self):
         """
@@ -165,6 +177,683 @@ class TestFileStorage(unittest.TestCase):
         """
         self.assertEqual(type(storage), FileStorage)
 
+    def test_all_cls(self):
+        """
+        Test that all(cls) returns the objects of cls and its subclasses.
+        """
+        base = BaseModel()
+        user = User()
+        storage.new(base)
+        storage.new(user)
+        self.assertEqual(storage.all(User), {'User.' + user.id: user})
+        self.assertEqual(len(storage.all(BaseModel)), 2)
+        storage.delete(user)
+        self.assertEqual(storage.all(User), {})
+        self.assertEqual(list(storage.all(BaseModel).values()), [base])
+
+    def test_related(self):
+        """
+        Test that the reverse foreign-key indexes follow changes.
+        """
+        state = State()
+        city = City()
+        city.state_id = state.id
+        storage.new(state)
+        storage.new(city)
+        self.assertEqual(state.cities, [city])
+        city.state_id = 'elsewhere'
+        self.assertEqual(state.cities, [])
+        self.assertEqual(storage.related(City, 'state_id', 'elsewhere'),
+                         [city])
+        city.state_id = state.id
+        self.assertEqual(state.cities, [city])
+        city.state_id = 'elsewhere'
+        storage.new(city)
+        self.assertEqual(storage.related(City, 'state_id', 'elsewhere'), [city])
+        storage.delete(city)
+        self.assertEqual(storage.related(City, 'state_id', 'elsewhere'), [])
+
+    def test_related_user(self):
+        """
+        Test the places and reviews of a User.
+        """
+        user = User()
+        place = Place()
+        place.user_id = user.id
+        review = Review()
+        review.user_id = user.id
+        review.place_id = place.id
+        for obj in (user, place, review):
+            storage.new(obj)
+        self.assertEqual(user.places, [place])
+        self.assertEqual(user.reviews, [review])
+        self.assertEqual(place.reviews, [review])
+
+    def test_get_count(self):
+        """
+        Test looking objects up by class and id, and counting them.
+        """
+        user = User()
+        state = State()
+        storage.new(user)
+        storage.new(state)
+        self.assertIs(storage.get(User, user.id), user)
+        self.assertIs(storage.get('State', state.id), state)
+        self.assertIsNone(storage.get(State, user.id))
+        self.assertIsNone(storage.get('Nope', user.id))
+        self.assertEqual(storage.count(), 2)
+        self.assertEqual(storage.count(User), 1)
+        self.assertEqual(storage.count('State'), 1)
+        self.assertEqual(storage.count(BaseModel), 2)
+        self.assertEqual(storage.count('BaseModel'), 0)
+        self.assertEqual(storage.count('Nope'), 0)
+        storage.delete(user)
+        self.assertIsNone(storage.get(User, user.id))
+        self.assertEqual(storage.count(User), 0)
+
+    def test_all_cls_cached(self):
+        """
+        Test that all(cls) is reused until an object of cls is added or removed.
+        """
+        state = State()
+        storage.new(state)
+        states = dict(storage.all(State))
+        generation = storage.generation(State)
+        with self.assertRaises(TypeError):
+            storage.all(State)['State.1'] = state
+        self.assertEqual(storage.all(State), states)
+        storage.new(state)
+        storage.new(User())
+        self.assertEqual(storage.all(State), states)
+        self.assertEqual(storage.generation(State), generation)
+        other = State()
+        storage.new(other)
+        self.assertGreater(storage.generation('State'), generation)
+        self.assertGreater(storage.generation(BaseModel), generation)
+        self.assertIn('State.' + other.id, storage.all(State))
+        storage.delete(other)
+        self.assertNotIn('State.' + other.id, storage.all(State))
+        self.assertEqual(len(storage.all(BaseModel)), 2)
+        key = 'State.' + state.id
+        storage.save()
+        storage.close()
+        self.assertIs(storage.all(State)[key], storage.all()[key])
+
+    def test_get_by_unique(self):
+        """
+        Test that emails are unique and looked up by get_by().
+        """
+        ada = User(email='ada@hbnb.io')
+        bob = User(email='bob@hbnb.io')
+        storage.new_many([ada, bob, User(), User()])
+        self.assertIs(storage.get_by(User, email='ada@hbnb.io'), ada)
+        self.assertIs(storage.get_by('User', email='bob@hbnb.io'), bob)
+        self.assertIsNone(storage.get_by(User, email='eve@hbnb.io'))
+        self.assertEqual(storage.query(User).filter(email='').count(), 2)
+        eve = User(email='ada@hbnb.io')
+        with self.assertRaises(ValueError):
+            storage.new(eve)
+        with self.assertRaises(ValueError):
+            storage.new_many([User(email='x@hbnb.io'),
+                              User(email='x@hbnb.io')])
+        self.assertEqual(storage.count(User), 4)
+        ada.email = 'ada@lovelace.io'
+        storage.new(ada)
+        storage.new(eve)
+        self.assertIs(storage.get_by(User, email='ada@hbnb.io'), eve)
+        storage.delete(bob)
+        self.assertIsNone(storage.get_by(User, email='bob@hbnb.io'))
+        storage.new(User(email='bob@hbnb.io'))
+        storage.save()
+        storage.reload()
+        with self.assertRaises(ValueError):
+            storage.new(User(email='ada@lovelace.io'))
+        ada = storage.get_by(User, email='ada@lovelace.io')
+        ada.email = 'ada@byron.io'
+        self.assertIs(storage.get_by(User, email='ada@byron.io'), ada)
+        storage.new(User(email='ada@lovelace.io'))
+        with self.assertRaises(ValueError):
+            storage.new(User(email='ada@byron.io'))
+        with self.assertRaises(ValueError):
+            storage.new(User(email=' Ada@Byron.io'))
+        ada.email = 'ADA@Turing.io '
+        self.assertIs(storage.get_by(User, email='ada@turing.io'), ada)
+
+    def test_places_near(self):
+        """
+        Test the radius and box searches follow inserts, updates and deletes.
+        """
+        lagos = Place(latitude=6.45, longitude=3.39)
+        ikeja = Place(latitude=6.60, longitude=3.35)
+        abuja = Place(latitude=9.07, longitude=7.49)
+        fiji = Place(latitude=-17.0, longitude=179.9)
+        for place in (lagos, ikeja, abuja, fiji, Place()):
+            storage.new(place)
+        self.assertEqual(storage.places_near(6.45, 3.39, 25), [lagos, ikeja])
+        self.assertEqual(storage.places_near(6.45, 3.39, 25, limit=1),
+                         [lagos])
+        self.assertEqual(storage.places_near(-17.0, -179.9, 30), [fiji])
+        box = storage.places_in_bbox(6, 3, 10, 8)
+        self.assertEqual(sorted(place.id for place in box),
+                         sorted([lagos.id, ikeja.id, abuja.id]))
+        self.assertEqual(storage.places_in_bbox(-20, 179, -10, -179), [fiji])
+        abuja.latitude, abuja.longitude = 6.5, 3.4
+        storage.new(abuja)
+        self.assertEqual(len(storage.places_near(6.45, 3.39, 25)), 3)
+        storage.delete(ikeja)
+        self.assertEqual(storage.places_near(6.45, 3.39, 25), [lagos, abuja])
+        lagos.latitude, lagos.longitude = 9.07, 7.49
+        self.assertEqual(storage.places_near(6.45, 3.39, 25), [abuja])
+
+    def test_search(self):
+        """
+        Test that the text index follows changes and is saved with the file.
+        """
+        beach = Place(name='Beach house', description='Quiet, near the sea')
+        loft = Place(name='Loft', description='City center')
+        review = Review(text='Quiet and clean')
+        for obj in (beach, loft, review, User()):
+            storage.new(obj)
+        self.assertEqual(storage.search('quiet sea'), [beach, review])
+        self.assertEqual(storage.search('quiet', 'Review'), [review])
+        self.assertEqual(storage.search('quiet', limit=1), [review])
+        with self.assertRaises(ValueError):
+            storage.search('quiet', User)
+        loft.description = 'Quiet loft'
+        storage.new(loft)
+        storage.delete(review)
+        self.assertEqual(storage.search('quiet', Review), [])
+        self.assertEqual(len(storage.search('quiet')), 2)
+        storage.save()
+        self.assertTrue(os.path.isfile(storage.search_path))
+        storage.new(review)
+        storage.save()
+        storage._FileStorage__objects = {}
+        storage._FileStorage__reindex()
+        storage.reload()
+        self.assertEqual(len(storage.search('quiet')), 3)
+        self.assertEqual(storage.search('center'), [])
+
+    def test_iter(self):
+        """
+        Test iterating over the objects in key order, in pages.
+        """
+        objs = [User() for _ in range(5)] + [State() for _ in range(3)]
+        for obj in objs:
+            storage.new(obj)
+        expected = sorted(objs, key=lambda obj: (
+            obj.__class__.__name__, obj.id))
+        self.assertEqual(list(storage.iter(batch_size=2)), expected)
+        self.assertEqual(list(storage.iter(User)), expected[3:])
+        self.assertEqual(list(storage.iter('State')), expected[:3])
+        self.assertEqual(list(storage.iter('Nope')), [])
+        self.assertEqual(list(storage.iter('BaseModel')), [])
+        self.assertEqual(list(storage.iter(BaseModel)), expected)
+        last = expected[4]
+        after_key = 'User.' + last.id
+        self.assertEqual(list(storage.iter(after_key=after_key)),
+                         expected[5:])
+        self.assertEqual(list(storage.iter(after_key='State.')), expected)
+
+    def test_save_many(self):
+        """
+        Test that save_many stores the objects with a single write.
+        """
+        users = [User() for _ in range(3)]
+        with patch.object(storage, 'flush', wraps=storage.flush) as flush:
+            storage.save_many(users)
+        flush.assert_called_once()
+        with open('file.json') as file:
+            saved = json.load(file)
+        for user in users:
+            self.assertIn('User.' + user.id, saved)
+            self.assertEqual(saved['User.' + user.id]['updated_at'],
+                             users[0].updated_at.isoformat())
+        self.assertEqual(storage.count(User), 3)
+
+    def test_reload_cache(self):
+        """
+        Test that reload reads the binary cache once it is built.
+        """
+        new = User()
+        storage.new(new)
+        storage.save()
+        with patch.dict(os.environ, {'HBNB_FILE_CACHE': 'on'}):
+            store = FileStorage()
+        try:
+            store._FileStorage__objects = {}
+            store._FileStorage__reindex()
+            store.reload()
+            self.assertTrue(os.path.exists('file.json.cache'))
+            store._FileStorage__objects = {}
+            store._FileStorage__reindex()
+            with patch('models.engine.file_storage.iter_items') as parse:
+                store.reload()
+            parse.assert_not_called()
+            self.assertIn('User.' + new.id, store.all())
+        finally:
+            os.remove('file.json.cache')
+
+    def test_save_dirty_only(self):
+        """
+        Test that save only encodes again the objects that changed.
+        """
+        users = [User(), User(), User()]
+        for user in users:
+            storage.new(user)
+        storage.save()
+        self.assertFalse(users[0].is_dirty())
+        users[1].first_name = 'Betty'
+        self.assertTrue(users[1].is_dirty())
+        with patch.object(User, 'to_dict', autospec=True,
+                          side_effect=User.to_dict) as to_dict:
+            storage.save()
+        to_dict.assert_called_once_with(users[1])
+        with open('file.json', 'r') as file:
+            data = json.load(file)
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data['User.' + users[1].id]['first_name'], 'Betty')
+        users[2].__dict__.update({'first_name': 'Ada'})
+        self.assertFalse(users[2].is_dirty())
+        users[2].mark_dirty()
+        storage.save()
+        with open('file.json', 'r') as file:
+            data = json.load(file)
+        self.assertEqual(data['User.' + users[2].id]['first_name'], 'Ada')
+        users[0].first_name = 'Grace'
+        self.assertEqual(storage.query(User).filter(
+            first_name='Grace').count(), 1)
+        self.assertFalse(users[0].is_dirty())
+        storage.save()
+        with open('file.json', 'r') as file:
+            data = json.load(file)
+        self.assertEqual(data['User.' + users[0].id]['first_name'], 'Grace')
+
+
+@unittest.skipIf(
+    os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+class TestFileStorageJournal(unittest.TestCase):
+    """
+    Class to test the journal mode of the file storage.
+    """
+
+    def setUp(self):
+        """
+        Set up a FileStorage in journal mode.
+        """
+        with patch.dict(os.environ, {'HBNB_FILE_MODE': 'journal'}):
+            self.store = FileStorage()
+        self.store._FileStorage__objects = {}
+        self.store._FileStorage__reindex()
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        for path in ('file.json', 'file.json.log',
+                     'file.json.log.compacting'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def test_save_appends(self):
+        """
+        Test that save appends to the journal instead of the file.
+        """
+        new = User()
+        self.store.new(new)
+        self.store.save()
+        self.assertFalse(os.path.exists('file.json'))
+        size = self.store.journal.size()
+        self.assertGreater(size, 0)
+        self.store.new(User())
+        self.store.save()
+        self.assertGreater(self.store.journal.size(), size)
+
+    def test_reload_replays(self):
+        """
+        Test that reload replays puts and deletes on top of the file.
+        """
+        kept = User()
+        gone = User()
+        self.store.new(kept)
+        self.store.new(gone)
+        self.store.save()
+        kept.email = 'kept@hbnb.io'
+        self.store.new(kept)
+        self.store.delete(gone)
+        self.store.save()
+        self.store._FileStorage__objects = {}
+        self.store._FileStorage__reindex()
+        self.store.reload()
+        objects = self.store.all()
+        self.assertEqual(list(objects), ['User.' + kept.id])
+        self.assertEqual(objects['User.' + kept.id].email, 'kept@hbnb.io')
+
+    def test_save_dirty(self):
+        """
+        Test that objects changed without new() are appended on save.
+        """
+        new = User()
+        self.store.new(new)
+        self.store.save()
+        new.first_name = 'Betty'
+        self.store.save()
+        self.store.save()
+        self.assertEqual(self.store.journal.records, 2)
+        self.store._FileStorage__objects = {}
+        self.store._FileStorage__reindex()
+        self.store.reload()
+        self.assertEqual(
+            self.store.all()['User.' + new.id].first_name, 'Betty')
+
+    def test_reload_torn_line(self):
+        """
+        Test that a torn last record of the journal is ignored.
+        """
+        new = User()
+        self.store.new(new)
+        self.store.save()
+        with open('file.json.log', 'a') as file:
+            file.write('{"op": "put", "key": "User.')
+        self.store._FileStorage__objects = {}
+        self.store._FileStorage__reindex()
+        self.store.reload()
+        self.assertIn('User.' + new.id, self.store.all())
+
+    def test_checkpoint(self):
+        """
+        Test that checkpoint folds the journal into the file.
+        """
+        kept = User()
+        gone = User()
+        self.store.new(kept)
+        self.store.new(gone)
+        self.store.save()
+        self.store.delete(gone)
+        self.store.save()
+        report = self.store.checkpoint()
+        self.assertEqual(report['records'], 3)
+        self.assertGreater(report['bytes_reclaimed'], 0)
+        self.assertGreaterEqual(report['seconds'], 0)
+        self.assertFalse(os.path.exists('file.json.log'))
+        with open('file.json', 'r') as file:
+            self.assertEqual(list(json.load(file)), ['User.' + kept.id])
+
+    def test_checkpoint_on_threshold(self):
+        """
+        Test that save compacts the journal once a threshold is reached.
+        """
+        self.store.journal.max_records = 2
+        self.store.new(User())
+        self.store.new(User())
+        with patch.object(self.store.journal,
+                          'compact_in_background') as compact:
+            self.store.save()
+        compact.assert_called_once_with('file.json')
+
+    def test_reload_interrupted_checkpoint(self):
+        """
+        Test that a journal moved aside by a checkpoint is replayed.
+        """
+        new = User()
+        self.store.new(new)
+        self.store.save()
+        os.replace('file.json.log', 'file.json.log.compacting')
+        self.store._FileStorage__objects = {}
+        self.store._FileStorage__reindex()
+        self.store.reload()
+        self.assertIn('User.' + new.id, self.store.all())
+
+
+@unittest.skipIf(
+    os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+class TestFileStorageSync(unittest.TestCase):
+    """
+    Class to test the deferred write policies of the file storage.
+    """
+
+    def make_store(self, **env):
+        """
+        Creates an empty FileStorage with the given environment.
+        """
+        with patch.dict(os.environ, env), patch('atexit.register'):
+            store = FileStorage()
+        store._FileStorage__objects = {}
+        store._FileStorage__reindex()
+        return store
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+    def test_batch(self):
+        """
+        Test that the interval policy writes once the batch is full.
+        """
+        store = self.make_store(HBNB_FILE_SYNC='interval',
+                                HBNB_FILE_SYNC_MS='60000',
+                                HBNB_FILE_SYNC_BATCH='3')
+        for i in range(3):
+            self.assertFalse(os.path.exists('file.json'))
+            store.new(User())
+            store.save()
+        with open('file.json', 'r') as file:
+            self.assertEqual(len(json.load(file)), 3)
+
+    def test_interval(self):
+        """
+        Test that the interval policy writes once the window elapsed.
+        """
+        store = self.make_store(HBNB_FILE_SYNC='interval',
+                                HBNB_FILE_SYNC_MS='10')
+        store.new(User())
+        store.save()
+        for i in range(100):
+            if os.path.exists('file.json'):
+                break
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists('file.json'))
+
+    def test_close(self):
+        """
+        Test that the close policy only writes on flush and close.
+        """
+        store = self.make_store(HBNB_FILE_SYNC='close')
+        store.new(User())
+        store.save()
+        self.assertFalse(os.path.exists('file.json'))
+        store.flush()
+        self.assertTrue(os.path.exists('file.json'))
+        os.remove('file.json')
+        store.save()
+        store.close()
+        self.assertTrue(os.path.exists('file.json'))
+
+
+@unittest.skipIf(
+    os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+class TestFileStorageSharded(unittest.TestCase):
+    """
+    Class to test the sharded layout of the file storage.
+    """
+
+    def make_store(self, **env):
+        """
+        Creates an empty FileStorage in sharded mode.
+        """
+        env['HBNB_FILE_MODE'] = 'sharded'
+        with patch.dict(os.environ, env):
+            store = FileStorage()
+        store._FileStorage__objects = {}
+        store._FileStorage__reindex()
+        return store
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        shutil.rmtree('file.json.d', ignore_errors=True)
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+    def test_save_by_class(self):
+        """
+        Test that only the shards of changed objects are rewritten.
+        """
+        store = self.make_store()
+        user = User()
+        store.new(user)
+        store.new(State())
+        store.save()
+        self.assertEqual(sorted(os.listdir('file.json.d')),
+                         ['State.json', 'User.json'])
+        user.first_name = 'Betty'
+        with patch('models.engine.file_storage.dump_encoded',
+                   wraps=dump_encoded) as dump:
+            store.save()
+        self.assertEqual(dump.call_count, 1)
+        store.delete(user)
+        store.save()
+        self.assertEqual(os.listdir('file.json.d'), ['State.json'])
+
+    def test_reload_only_asked(self):
+        """
+        Test that HBNB_FILE_LOAD restricts the shards that are loaded.
+        """
+        store = self.make_store()
+        user = User()
+        state = State()
+        store.new(user)
+        store.new(state)
+        store.save()
+        store = self.make_store(HBNB_FILE_LOAD='User')
+        store.reload()
+        self.assertEqual(list(store.all()), ['User.' + user.id])
+        store.new(State())
+        store.save()
+        store = self.make_store()
+        store.reload()
+        self.assertEqual(len(store.all(State)), 2)
+
+    def test_by_hash(self):
+        """
+        Test the layout with one shard per hash bucket.
+        """
+        store = self.make_store(HBNB_FILE_SHARD_BY='hash',
+                                HBNB_FILE_SHARD_COUNT='4')
+        users = [User() for i in range(20)]
+        for user in users:
+            store.new(user)
+        store.save()
+        self.assertLessEqual(len(os.listdir('file.json.d')), 4)
+        store = self.make_store(HBNB_FILE_SHARD_BY='hash',
+                                HBNB_FILE_SHARD_COUNT='4')
+        store.reload()
+        self.assertEqual(len(store.all(User)), 20)
+
+    def test_from_snapshot(self):
+        """
+        Test that an existing file.json is split into shards.
+        """
+        user = User()
+        with open('file.json', 'w') as file:
+            json.dump({'User.' + user.id: user.to_dict()}, file)
+        store = self.make_store()
+        store.reload()
+        store.save()
+        self.assertEqual(os.listdir('file.json.d'), ['User.json'])
+
+
+@unittest.skipIf(
+    os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+class TestFileStorageLazy(unittest.TestCase):
+    """
+    Class to test the lazy building of the objects on reload.
+    """
+
+    def setUp(self):
+        """
+        Save a few objects and reload them in a lazy FileStorage.
+        """
+        self.state = State()
+        self.city = City()
+        self.city.state_id = self.state.id
+        with open('file.json', 'w') as file:
+            json.dump({'State.' + self.state.id: self.state.to_dict(),
+                       'City.' + self.city.id: self.city.to_dict()}, file)
+        with patch.dict(os.environ, {'HBNB_FILE_HYDRATE': 'lazy'}):
+            self.store = FileStorage()
+        self.store._FileStorage__objects = {}
+        self.store._FileStorage__reindex()
+        with patch.object(State, '__init__') as init:
+            self.store.reload()
+        init.assert_not_called()
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        try:
+            os.remove('file.json')
+        except FileNotFoundError:
+            pass
+
+    def test_build_on_access(self):
+        """
+        Test that objects are built on first access only.
+        """
+        objects = self.store.all()
+        self.assertIsInstance(objects, LazyObjects)
+        key = 'State.' + self.state.id
+        self.assertIs(type(dict.get(objects, key)), dict)
+        state = objects[key]
+        self.assertIsInstance(state, State)
+        self.assertEqual(state.id, self.state.id)
+        self.assertIs(objects[key], state)
+        self.assertIs(self.store.all(State)[key], state)
+        self.assertIs(type(dict.get(objects, 'City.' + self.city.id)), dict)
+
+    def test_views(self):
+        """
+        Test that values, items and get build the objects.
+        """
+        objects = self.store.all()
+        self.assertEqual(len(objects.values()), 2)
+        for value in objects.values():
+            self.assertNotIsInstance(value, dict)
+        for key, value in objects.items():
+            self.assertEqual(key.partition('.')[2], value.id)
+        self.assertIsNone(objects.get('State.none'))
+
+    def test_related(self):
+        """
+        Test that the indexes work on the raw dictionaries.
+        """
+        state = self.store.all()['State.' + self.state.id]
+        cities = self.store.related(City, 'state_id', state.id)
+        self.assertEqual([city.id for city in cities], [self.city.id])
+        self.assertIsInstance(cities[0], City)
+
+    def test_save(self):
+        """
+        Test that saving writes both built and raw objects.
+        """
+        self.store.all()['State.' + self.state.id].name = 'Lagos'
+        self.store.save()
+        with open('file.json', 'r') as file:
+            data = json.load(file)
+        self.assertEqual(data['State.' + self.state.id]['name'], 'Lagos')
+        self.assertEqual(data['City.' + self.city.id], self.city.to_dict())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""
+Module for testing the incremental reading and writing of the storage file.
+"""
+import json
+import unittest
+from io import StringIO
+
+from models.engine.json_stream import dump_items, iter_items
+
+
+class TestJsonStream(unittest.TestCase):
+    """
+    Class to test iter_items and dump_items.
+    """
+
+    data = {
+        'User.1': {'id': '1', '__class__': 'User', 'name': 'a "}{" b'},
+        'Place.2': {'id': '2', 'price_by_night': 120, 'latitude': -1.5e3,
+                    'amenity_ids': ['x', 'y'], 'nested': {'k': [1, None]}},
+        'State.3': {}
+    }
+
+    def test_dump_items(self):
+        """
+        Test that dump_items writes what json.dump writes.
+        """
+        out = StringIO()
+        dump_items(self.data.items(), out)
+        self.assertEqual(out.getvalue(), json.dumps(self.data))
+
+    def test_iter_items(self):
+        """
+        Test that iter_items reads entries across chunk boundaries.
+        """
+        text = json.dumps(self.data, indent=2)
+        for chunk_size in (1, 2, 3, 7, 64, 1 << 16):
+            items = list(iter_items(StringIO(text), chunk_size))
+            self.assertEqual(dict(items), self.data)
+            self.assertEqual([key for key, _ in items], list(self.data))
+
+    def test_iter_items_empty_object(self):
+        """
+        Test reading an empty object.
+        """
+        self.assertEqual(list(iter_items(StringIO(' { } '))), [])
+
+    def test_iter_items_invalid(self):
+        """
+        Test that invalid files raise a ValueError.
+        """
+        for text in ('', '[]', '{"a": 1', '{"a" 1}', '{1: 2}', '{"a": 1,}'):
+            with self.assertRaises(ValueError):
+                list(iter_items(StringIO(text), 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+"""
+Module for testing the query builder on FileStorage.
+"""
+import os
+import unittest
+
+from models import storage
+from models.city import City
+from models.place import Place
+
+
+@unittest.skipIf(
+    os.getenv('HBNB_TYPE_STORAGE') in ('db', 'sqlite'), 'FileStorage test')
+class TestFileStorageQuery(unittest.TestCase):
+    """
+    Class to test storage.query() on FileStorage.
+    """
+
+    def setUp(self):
+        """
+        Store two cities with a few places each.
+        """
+        storage._FileStorage__objects = {}
+        storage._FileStorage__reindex()
+        self.cities = [City(), City()]
+        self.places = []
+        for i, price in enumerate((80, 120, 40, 40, 200, 90)):
+            place = Place()
+            place.city_id = self.cities[i % 2].id
+            place.price_by_night = price
+            self.places.append(place)
+        storage.new_many(self.cities + self.places)
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        storage._FileStorage__objects = {}
+        storage._FileStorage__reindex()
+
+    def test_filter_order_limit(self):
+        """
+        Test the places of a city under a price, cheapest first.
+        """
+        query = storage.query(Place).filter(
+            city_id=self.cities[0].id, price_by_night__lt=100)
+        expected = sorted(
+            (place for place in self.places[::2]
+             if place.price_by_night < 100),
+            key=lambda place: place.price_by_night)
+        self.assertEqual(query.order_by('price_by_night').all(), expected)
+        self.assertEqual(query.order_by('price_by_night').limit(1).all(),
+                         expected[:1])
+        self.assertEqual(query.count(), 2)
+
+    def test_order_by_several_keys(self):
+        """
+        Test sorting by a descending key, then an ascending one.
+        """
+        places = storage.query('Place').order_by(
+            '-price_by_night', 'id').offset(2).limit(3).all()
+        expected = sorted(self.places,
+                          key=lambda place: (-place.price_by_night, place.id))
+        self.assertEqual(places, expected[2:5])
+
+    def test_operators(self):
+        """
+        Test the in, ne and ge operators and first().
+        """
+        ids = [self.places[0].id, self.places[1].id]
+        self.assertEqual(storage.query(Place).filter(id__in=ids).count(), 2)
+        self.assertEqual(
+            storage.query(Place).filter(id__in=ids + ids).count(), 2)
+        city_id = self.cities[0].id
+        self.assertEqual(
+            storage.query(Place).filter(city_id__in=[city_id, city_id]).all(),
+            storage.query(Place).filter(city_id=city_id).all())
+        self.assertEqual(
+            storage.query(Place).filter(price_by_night__ne=40).count(), 4)
+        self.assertIs(storage.query(Place).filter(
+            price_by_night__ge=200).first(), self.places[4])
+        self.assertIsNone(storage.query(City).filter(id='nope').first())
+        with self.assertRaises(ValueError):
+            storage.query(Place).filter(price_by_night__like=1)
+        with self.assertRaises(ValueError):
+            storage.query(Place).filter(id__in=ids[0])
+
+    def test_early_stop(self):
+        """
+        Test that an unsorted limited query stops testing objects.
+        """
+        tested = []
+        query = storage.query(Place).filter(price_by_night__gt=0).limit(2)
+        matches = query.matches
+        query.matches = lambda obj: tested.append(obj) or matches(obj)
+        self.assertEqual(len(query.all()), 2)
+        self.assertEqual(len(tested), 2)
+
+    def test_sorted_index(self):
+        """
+        Test that an ordered query reads a sorted index without sorting.
+        """
+        query = storage.query(Place).order_by('price_by_night').limit(2)
+        tested = []
+        matches = query.matches
+        query.matches = lambda obj: tested.append(obj) or matches(obj)
+        query.sort = query.top = None
+        self.assertEqual([place.price_by_night for place in query.all()],
+                         [40, 40])
+        self.assertEqual(len(tested), 2)
+        query = storage.query(Place).filter(
+            price_by_night__gt=40, price_by_night__le=120)
+        self.assertEqual(query.count(), 3)
+        self.assertEqual(
+            [place.price_by_night for place in query.order_by(
+                '-price_by_night')], [120, 90, 80])
+
+    def test_composite_index(self):
+        """
+        Test the places of a city by price, updated as places change.
+        """
+        city = self.cities[1]
+        free = Place()
+        free.city_id = city.id
+        free.price_by_night = None
+        storage.new(free)
+        query = storage.query(Place).filter(city_id=city.id).order_by(
+            'price_by_night')
+        query.sort = query.top = None
+        self.assertEqual([place.price_by_night for place in query],
+                         [40, 90, 120, None])
+        self.places[1].price_by_night = 10
+        storage.new(self.places[1])
+        storage.delete(self.places[5])
+        self.assertEqual(
+            [place.price_by_night for place in query.filter(
+                price_by_night__lt=100)], [10, 40])
+        self.assertEqual(query.filter(price_by_night='40').count(), 0)
+
+    def test_sorted_index_unsaved(self):
+        """
+        Test that a sorted index sees a price changed without a save.
+        """
+        query = storage.query(Place).order_by('price_by_night')
+        self.assertEqual(query.first().price_by_night, 40)
+        self.places[4].price_by_night = 10
+        self.assertIs(query.first(), self.places[4])
+        query = storage.query(Place).filter(price_by_night__gt=150)
+        self.assertEqual(query.count(), 0)
+        self.places[0].price_by_night = 300
+        self.assertEqual(query.all(), [self.places[0]])
+        storage.save()
+        self.places[0].price_by_night = 80
+        self.assertEqual(query.count(), 0)
+        os.remove('file.json')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""
+Module for testing the full-text index.
+"""
+import os
+import unittest
+
+from models.engine.search import TextIndex, document_text, tokenize
+
+
+class TestTextIndex(unittest.TestCase):
+    """
+    Class to test TextIndex.
+    """
+
+    def setUp(self):
+        """
+        Set up an index of three documents.
+        """
+        self.index = TextIndex()
+        self.index.add('Place.1', 'Quiet beach house, near the beach')
+        self.index.add('Place.2', 'Loft in the city center')
+        self.index.add('Review.3', 'Great house, quiet street')
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        try:
+            os.remove('test.search')
+        except FileNotFoundError:
+            pass
+
+    def test_tokenize(self):
+        """
+        Test that texts are split into lowercase words.
+        """
+        self.assertEqual(tokenize("Near the Beach, 2 rooms!"),
+                         ['near', 'the', 'beach', '2', 'rooms'])
+        self.assertEqual(document_text({'name': 'Loft', 'text': None},
+                                       ('name', 'text')), 'Loft')
+
+    def test_search(self):
+        """
+        Test that the matches are ranked by BM25 score.
+        """
+        keys = [key for key, _ in self.index.search('quiet beach')]
+        self.assertEqual(keys, ['Place.1', 'Review.3'])
+        self.assertEqual(self.index.search('QUIET', prefix='Review.')[0][0],
+                         'Review.3')
+        self.assertEqual(len(self.index.search('house', limit=1)), 1)
+        self.assertEqual(self.index.search('castle'), [])
+
+    def test_add_remove(self):
+        """
+        Test that documents are replaced and removed.
+        """
+        self.index.add('Place.2', 'Beach loft')
+        self.assertEqual(len(self.index.search('city')), 0)
+        self.assertEqual(len(self.index.search('beach')), 2)
+        self.index.remove('Place.1')
+        self.index.remove('Place.9')
+        self.assertEqual([key for key, _ in self.index.search('beach')],
+                         ['Place.2'])
+        self.assertEqual(len(self.index), 2)
+
+    def test_sync(self):
+        """
+        Test that sync only updates the documents that changed.
+        """
+        docs = [('Place.1', 'Quiet beach house, near the beach'),
+                ('Place.2', 'Loft by the river'),
+                ('Place.4', 'Cabin')]
+        self.assertEqual(self.index.sync(docs), 3)
+        self.assertNotIn('Review.3', self.index)
+        self.assertEqual(self.index.sync(docs), 0)
+        self.assertEqual(self.index.search('river')[0][0], 'Place.2')
+
+    def test_dump_load(self):
+        """
+        Test that an index is read back from its file.
+        """
+        self.assertTrue(self.index.changed)
+        self.index.dump('test.search')
+        self.assertFalse(self.index.changed)
+        index = TextIndex.load('test.search')
+        self.assertEqual(index.search('quiet beach'),
+                         self.index.search('quiet beach'))
+        self.assertFalse(index.changed)
+        self.assertIsNone(TextIndex.load('missing.search'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""
+Module for testing the binary cache of the storage file.
+"""
+import json
+import os
+import unittest
+
+from models.engine.snapshot_cache import SnapshotCache
+
+
+class TestSnapshotCache(unittest.TestCase):
+    """
+    Class to test SnapshotCache.
+    """
+
+    data = {
+        'User.1': {'id': '1', '__class__': 'User', 'email': 'a@b.c'},
+        'State.2': {'id': '2', '__class__': 'State', 'name': 'Lagos'},
+        'City.3': {'id': '3', '__class__': 'City', 'state_id': '2'}
+    }
+
+    def setUp(self):
+        """
+        Write a storage file and build its cache.
+        """
+        with open('snapshot.json', 'w') as file:
+            json.dump(self.data, file)
+        self.cache = SnapshotCache('snapshot.json.cache', 'snapshot.json',
+                                   chunk_size=2)
+        entries = list(self.cache.build(self.data.items()))
+        self.assertEqual(entries, list(self.data.items()))
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        for path in ('snapshot.json', 'snapshot.json.cache'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def test_read(self):
+        """
+        Test that a matching cache returns the entries.
+        """
+        self.assertEqual(dict(self.cache.read()), self.data)
+
+    def test_read_missing(self):
+        """
+        Test that there is nothing to read without a cache file.
+        """
+        os.remove('snapshot.json.cache')
+        self.assertIsNone(self.cache.read())
+
+    def test_read_size_changed(self):
+        """
+        Test that the cache is not used once the storage file grew.
+        """
+        with open('snapshot.json', 'a') as file:
+            file.write(' ')
+        self.assertIsNone(self.cache.read())
+
+    def test_read_content_changed(self):
+        """
+        Test that the hash catches a change keeping the mtime and size.
+        """
+        stat = os.stat('snapshot.json')
+        with open('snapshot.json', 'r+') as file:
+            text = file.read().replace('Lagos', 'Kano!')
+            file.seek(0)
+            file.write(text)
+        os.utime('snapshot.json', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(self.cache.read())
+
+    def test_build_source_changed(self):
+        """
+        Test that no cache is kept if the file changed while it was read.
+        """
+        os.remove('snapshot.json.cache')
+
+        def entries():
+            yield from self.data.items()
+            with open('snapshot.json', 'a') as file:
+                file.write(' ')
+
+        list(self.cache.build(entries()))
+        self.assertFalse(os.path.exists('snapshot.json.cache'))
+        self.assertFalse(os.path.exists('snapshot.json.cache.tmp'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Module for testing the ordered index.
+"""
+import unittest
+
+from models.engine.sorted_index import SortedIndex
+
+
+class TestSortedIndex(unittest.TestCase):
+    """
+    Class to test SortedIndex.
+    """
+
+    def setUp(self):
+        """
+        Set up an index of five keys, one of them without a value.
+        """
+        self.index = SortedIndex()
+        for key, value in (('a', 30), ('b', 10), ('c', 20), ('d', 20),
+                           ('e', None)):
+            self.index.add(key, value)
+
+    def keys(self, *args, **kwargs):
+        """
+        Returns the keys of the index in a range.
+        """
+        return self.index.keys(*self.index.span(*args, **kwargs))
+
+    def test_span(self):
+        """
+        Test the inclusive and exclusive bounds of a range.
+        """
+        self.assertEqual(self.keys(), ['b', 'c', 'd', 'a'])
+        self.assertEqual(self.keys(20, 30), ['c', 'd', 'a'])
+        self.assertEqual(self.keys(20, 30, False, False), [])
+        self.assertEqual(self.keys(high=20, high_inclusive=False), ['b'])
+        self.assertEqual(self.keys(40, 10), [])
+        self.assertEqual(self.index.keys(0, 2, reverse=True), ['c', 'b'])
+        self.assertEqual(self.index.missing(), ['e'])
+
+    def test_add_remove(self):
+        """
+        Test that updates keep the built lists sorted.
+        """
+        self.keys()
+        self.index.add('a', 5)
+        self.index.add('e', 25)
+        self.index.add('b', None)
+        self.index.remove('c')
+        self.index.remove('z')
+        self.assertEqual(self.keys(), ['a', 'd', 'e'])
+        self.assertEqual(self.index.missing(), ['b'])
+        self.assertEqual(len(self.index), 3)
+
+    def test_composite(self):
+        """
+        Test a range of values within a leading value.
+        """
+        index = SortedIndex()
+        for key, value in (('a', ('x', 3)), ('b', ('y', 1)), ('c', ('x', 1))):
+            index.add(key, value)
+        start, stop = index.span(('x', float('-inf')), ('x', 2))
+        self.assertEqual(index.keys(start, stop), ['c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+"""
+Module for testing SQLiteStorage.
+"""
+import os
+import unittest
+import uuid
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from models import storage
+from models.engine.cache import LRUCache
+from models.engine.sqlite_storage import SQLiteStorage
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.user import User
+
+
+def make(cls, **kwargs):
+    """
+    Builds a model instance with the columns DBStorage requires.
+
+    Args:
+        cls (class): The model class.
+        **kwargs: The other attributes of the instance.
+
+    Returns:
+        BaseModel: The instance.
+    """
+    now = datetime.now().isoformat()
+    return cls(id=str(uuid.uuid4()), created_at=now, updated_at=now,
+               **kwargs)
+
+
+@unittest.skipIf(
+    os.getenv('HBNB_TYPE_STORAGE') != 'sqlite', 'SQLiteStorage test')
+class TestSQLiteStorage(unittest.TestCase):
+    """
+    Class to test the SQLite storage engine.
+    """
+
+    def setUp(self):
+        """
+        Save a state and one of its cities.
+        """
+        self.state = make(State, name='Lagos')
+        self.city = make(City, name='Ikeja', state_id=self.state.id)
+        storage.save_many([self.state, self.city])
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        storage.delete(self.city)
+        storage.delete(self.state)
+        storage.save()
+        storage.close()
+
+    def test_storage_var_created(self):
+        """
+        Test that SQLiteStorage object storage is created.
+        """
+        self.assertEqual(type(storage), SQLiteStorage)
+
+    def test_pragmas(self):
+        """
+        Test that the connections are set up with the pragmas.
+        """
+        engine = storage._DBStorage__engine
+        with engine.connect() as connection:
+            foreign_keys = connection.execute(
+                text('PRAGMA foreign_keys')).scalar()
+            journal_mode = connection.execute(
+                text('PRAGMA journal_mode')).scalar()
+        self.assertEqual(foreign_keys, 1)
+        if os.getenv('HBNB_SQLITE_PATH') != ':memory:':
+            self.assertEqual(journal_mode, 'wal')
+
+    def test_foreign_key_indexes(self):
+        """
+        Test that the foreign key columns are indexed.
+        """
+        inspector = inspect(storage._DBStorage__engine)
+        indexed = {column for index in inspector.get_indexes('places')
+                   for column in index['column_names']}
+        self.assertIn('city_id', indexed)
+        self.assertIn('user_id', indexed)
+
+    def test_get_count_relationship(self):
+        """
+        Test looking objects up, counting them and their relationships.
+        """
+        storage.close()
+        state = storage.get(State, self.state.id)
+        self.assertEqual(state.name, 'Lagos')
+        self.assertEqual([city.id for city in state.cities], [self.city.id])
+        self.assertGreaterEqual(storage.count(City), 1)
+        self.assertIn(state, storage.iter(State))
+
+    def test_query(self):
+        """
+        Test that a query runs as SQL.
+        """
+        cities = storage.query(City).filter(
+            state_id=self.state.id, name__in=['Ikeja', 'Ikoyi'])
+        self.assertEqual([city.id for city in cities.order_by('-name')],
+                         [self.city.id])
+        self.assertEqual(cities.count(), 1)
+        self.assertIsNone(cities.filter(name__ne='Ikeja').first())
+        with self.assertRaises(ValueError):
+            storage.query(City).filter(nope=1).all()
+
+    def test_places_near(self):
+        """
+        Test the radius and box searches run on the indexed coordinates.
+        """
+        user = make(User, email='a@b.c', password='pwd')
+        places = [make(Place, name=name, city_id=self.city.id,
+                       user_id=user.id, latitude=lat, longitude=lon)
+                  for name, lat, lon in (('lagos', 6.45, 3.39),
+                                         ('ikeja', 6.60, 3.35),
+                                         ('abuja', 9.07, 7.49))]
+        storage.save_many([user] + places)
+        try:
+            near = storage.places_near(6.45, 3.39, 25)
+            self.assertEqual([place.name for place in near],
+                             ['lagos', 'ikeja'])
+            self.assertEqual(len(storage.places_near(6.45, 3.39, 25, 1)), 1)
+            box = storage.places_in_bbox(6, 3, 10, 8)
+            self.assertEqual(len(box), 3)
+            indexes = inspect(storage._DBStorage__engine).get_indexes(
+                'places')
+            self.assertIn(['latitude', 'longitude'],
+                          [index['column_names'] for index in indexes])
+            self.assertIn(['city_id', 'price_by_night'],
+                          [index['column_names'] for index in indexes])
+        finally:
+            for obj in places + [user]:
+                storage.delete(obj)
+            storage.save()
+
+    def test_search(self):
+        """
+        Test that the text index is read from the database and updated.
+        """
+        user = make(User, email='a@b.c', password='pwd')
+        place = make(Place, name='Beach house', city_id=self.city.id,
+                     user_id=user.id)
+        storage.save_many([user, place])
+        try:
+            self.assertEqual([obj.id for obj in storage.search('beach')],
+                             [place.id])
+            place.description = 'Quiet street'
+            storage.save()
+            self.assertEqual(storage.search('quiet', 'Place'), [place])
+            with self.assertRaises(ValueError):
+                storage.search('quiet', User)
+        finally:
+            storage.delete(place)
+            storage.delete(user)
+            storage.save()
+        self.assertEqual(storage.search('beach'), [])
+
+    def test_get_by_unique(self):
+        """
+        Test that emails are unique and looked up by get_by().
+        """
+        user = make(User, email='ada@hbnb.io', password='pwd')
+        storage.save_many([user])
+        try:
+            self.assertEqual(storage.get_by(User, email='ada@hbnb.io').id,
+                             user.id)
+            self.assertIsNone(storage.get_by(User, email='eve@hbnb.io'))
+            with self.assertRaises(ValueError):
+                storage.new(make(User, email='ada@hbnb.io', password='pwd'))
+            with self.assertRaises(ValueError):
+                storage.new(make(User, email='Ada@HBNB.io', password='pwd'))
+            with self.assertRaises(ValueError):
+                storage.new_many([make(User, email='bob@hbnb.io',
+                                       password='pwd'),
+                                  make(User, email='ada@hbnb.io',
+                                       password='pwd')])
+            self.assertIsNone(storage.get_by(User, email='bob@hbnb.io'))
+            indexes = inspect(storage._DBStorage__engine).get_indexes(
+                'users')
+            self.assertIn((['email'], 1), [
+                (index['column_names'], index['unique'])
+                for index in indexes])
+        finally:
+            storage.delete(user)
+            storage.save()
+
+    def test_cache(self):
+        """
+        Test that the object cache is read through and invalidated.
+        """
+        storage.cache = LRUCache(16)
+        try:
+            storage.close()
+            state = storage.get(State, self.state.id)
+            storage.close()
+            self.assertEqual(storage.get(State, self.state.id).id, state.id)
+            self.assertEqual(storage.cache.hits, 1)
+            states = storage.all(State)
+            self.assertEqual(storage.all(State).keys(), states.keys())
+            self.assertEqual(storage.cache.hits, 2)
+            state = storage.get(State, self.state.id)
+            state.name = 'Abuja'
+            storage.save()
+            storage.close()
+            self.assertEqual(storage.get(State, self.state.id).name, 'Abuja')
+            self.assertEqual(storage.cache.hits, 3)
+        finally:
+            storage.cache = None
+
+
+if __name__ == '__main__':
+    unittest.main()
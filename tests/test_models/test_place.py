@@ -29,7 +29,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.city_id), expected_type)
 
     def test_user_id(self):
@@ -40,7 +40,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.user_id), expected_type)
 
     def test_name(self):
@@ -51,7 +51,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.name), expected_type)
 
     def test_description(self):
@@ -62,7 +62,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.description), expected_type)
 
     def test_number_rooms(self):
@@ -73,7 +73,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = int if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = int if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.number_rooms), expected_type)
 
     def test_number_bathrooms(self):
@@ -84,7 +84,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = int if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = int if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.number_bathrooms), expected_type)
 
     def test_max_guest(self):
@@ -95,7 +95,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = int if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = int if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.max_guest), expected_type)
 
     def test_price_by_night(self):
@@ -106,7 +106,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = int if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = int if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.price_by_night), expected_type)
 
     def test_latitude(self):
@@ -117,7 +117,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = float if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = float if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.latitude), expected_type)
 
     def test_longitude(self):
@@ -128,7 +128,7 @@ class TestPlace(TestBasemodel):
         the correct type depending on the storage type (file or database).
         """
         new = self.value()
-        expected_type = float if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = float if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.longitude), expected_type)
 
     def test_amenity_ids(self):
@@ -28,7 +28,7 @@ class TestReview(TestBasemodel):
         has the correct type based on the storage type.
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.place_id), expected_type)
 
     def test_user_id_type(self):
@@ -39,7 +39,7 @@ class TestReview(TestBasemodel):
         has the correct type based on the storage type.
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.user_id), expected_type)
 
     def test_text_type(self):
@@ -50,5 +50,5 @@ class TestReview(TestBasemodel):
         has the correct type based on the storage type.
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.text), expected_type)
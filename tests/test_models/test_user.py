@@ -29,7 +29,7 @@ class TestUser(TestBasemodel):
         has the correct type based on the storage type.
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.first_name), expected_type)
 
     def test_last_name_type(self):
@@ -40,7 +40,7 @@ class TestUser(TestBasemodel):
         has the correct type based on the storage type.
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.last_name), expected_type)
 
     def test_email_type(self):
@@ -51,7 +51,7 @@ class TestUser(TestBasemodel):
         has the correct type based on the storage type.
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.email), expected_type)
 
     def test_password_type(self):
@@ -62,5 +62,5 @@ class TestUser(TestBasemodel):
         has the correct type based on the storage type.
         """
         new = self.value()
-        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') != 'db' else type(None)
+        expected_type = str if os.getenv('HBNB_TYPE_STORAGE') not in ('db', 'sqlite') else type(None)
         self.assertEqual(type(new.password), expected_type)